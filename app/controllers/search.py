@@ -0,0 +1,486 @@
+"""Semantic search controller for the Streamlit app.
+
+Loads chunk embeddings into an in-process matrix once per process and
+answers queries with a vectorized cosine scan. Azure SQL Basic tier has
+no server-side vector index, so the ANN-index role (HNSW on half-width
+vectors) is played locally: the resident matrix is float16 - half the
+memory of full precision, with unit-vector cosines well inside fp16's
+precision - and scoring upcasts one block at a time to float32 so the
+dot products still run through BLAS.
+
+Configuration mirrors the ingestion functions:
+    AZURE_OPENAI_ENDPOINT + AZURE_OPENAI_EMBEDDING_DEPLOYMENT
+    (managed identity, or AZURE_OPENAI_API_KEY if set)
+    OPENAI_API_KEY as direct-OpenAI fallback
+"""
+
+import json
+import math
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pyodbc
+from azure.identity import DefaultAzureCredential, get_bearer_token_provider
+from openai import AzureOpenAI, OpenAI
+
+from shared.config import SEARCH_SCORE_BLOCK_ROWS
+from shared.db.connection import get_connection
+from shared.db.models import EMBEDDING_STATUS_CODES
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 1536
+
+DEFAULT_LIMIT = 10
+DEFAULT_THRESHOLD = 0.3
+
+# Clamps for the auto-tuned scoring block (see _score_block_rows); the
+# upper bound keeps the float32 upcast buffer around 50 MB
+MIN_SCORE_BLOCK_ROWS = 1024
+MAX_SCORE_BLOCK_ROWS = 8192
+
+# Past this many chunks, searches shortlist by Hamming distance over
+# 1-bit sign vectors before exact cosine reranking; below it a full
+# exact scan is already cheap
+BINARY_SHORTLIST_CUTOFF = 8192
+
+# Shortlist size as a multiple of the requested limit - wide enough
+# that the exact rerank recovers near-full recall
+BINARY_SHORTLIST_FACTOR = 10
+
+# Byte-wise popcount lookup for Hamming distances over packed bits
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# Process-level caches: embedding client, search index, and the
+# database connection reused across searches
+_client: AzureOpenAI | OpenAI | None = None
+_model_name: str | None = None
+_index: tuple[list[dict], np.ndarray, np.ndarray] | None = None
+_search_conn: pyodbc.Connection | None = None
+# pyodbc declares threadsafety=1: the module is shareable, connections
+# are not. Streamlit serves each session on its own thread, so access
+# to the shared connection is serialized through this lock.
+_search_conn_lock = threading.Lock()
+
+# Hot SQL as module-level constants. SQL Server keys its plan cache on
+# the exact statement text, so every call must submit byte-identical
+# SQL (parameters bound, never interpolated) to reuse the cached plan
+_INDEX_LOAD_SQL = f"""
+    SELECT c.id, c.text, c.section, c.page_start, c.page_end,
+           s.title, s.author, c.embedding_bin, c.embedding
+    FROM chunks c
+    JOIN sources s ON c.source_id = s.id
+    WHERE c.embedding_status = {EMBEDDING_STATUS_CODES["COMPLETE"]}
+"""
+
+# A match in the section heading says more about a chunk's topic than
+# one in the body; its rank counts this many extra times
+SECTION_RANK_BOOST = 2
+
+_KEYWORD_SEARCH_SQL = f"""
+    SELECT TOP (?) c.id, c.text, c.section, c.page_start, c.page_end,
+           s.title, s.author,
+           ft.RANK + {SECTION_RANK_BOOST} * ISNULL(fs.RANK, 0) AS combined_rank
+    FROM FREETEXTTABLE(chunks, ([text], section), ?) ft
+    LEFT JOIN FREETEXTTABLE(chunks, section, ?) fs ON fs.[KEY] = ft.[KEY]
+    JOIN chunks c ON c.id = ft.[KEY]
+    JOIN sources s ON c.source_id = s.id
+    ORDER BY combined_rank DESC
+"""
+
+_CACHE_LOOKUP_SQL = "SELECT id, query_embedding, result_json FROM query_cache"
+
+_CACHE_HIT_SQL = "UPDATE query_cache SET hits = hits + 1 WHERE id = ?"
+
+_CACHE_INSERT_SQL = (
+    "INSERT INTO query_cache (query_embedding, result_json) VALUES (?, ?)"
+)
+
+_CACHE_EVICT_SQL = """
+    DELETE FROM query_cache
+    WHERE id IN (
+        SELECT TOP (?) id FROM query_cache
+        ORDER BY hits ASC, created_at ASC
+    )
+"""
+
+
+@contextmanager
+def _search_cursor(commit: bool = False):
+    """Cursor on the process-level search connection.
+
+    Search replays the same handful of fixed-text statements, so the
+    server has a cached plan for each; reusing one live connection
+    means every call executes against that warm session instead of
+    paying connection setup (and plan-cache misses on a cold session)
+    per query. Any failure discards the connection - it may be the
+    problem (dropped by the server, expired token) - and the next call
+    reconnects.
+
+    Calls are serialized through _search_conn_lock - concurrent
+    Streamlit sessions run on separate threads, and a pyodbc
+    connection cannot interleave two cursors safely. commit=False
+    rolls back on the way out: the connection is manual-commit, so the
+    first SELECT opens an implicit transaction that would otherwise
+    stay pinned (version store, log truncation) for as long as the app
+    idles between searches.
+    """
+    global _search_conn
+
+    with _search_conn_lock:
+        if _search_conn is None:
+            _search_conn = get_connection()
+        try:
+            cursor = _search_conn.cursor()
+            yield cursor
+            if commit:
+                _search_conn.commit()
+            else:
+                _search_conn.rollback()
+            cursor.close()
+        except Exception:
+            conn, _search_conn = _search_conn, None
+            try:
+                conn.rollback()
+                conn.close()
+            except pyodbc.Error:
+                pass
+            raise
+
+
+def _get_client() -> AzureOpenAI | OpenAI:
+    """Get or create the embedding client (Azure first, OpenAI fallback)."""
+    global _client, _model_name
+
+    if _client is not None:
+        return _client
+
+    azure_endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
+    azure_deployment = os.environ.get("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+
+    if azure_endpoint and azure_deployment:
+        azure_key = os.environ.get("AZURE_OPENAI_API_KEY")
+        if azure_key:
+            _client = AzureOpenAI(
+                azure_endpoint=azure_endpoint,
+                api_key=azure_key,
+                api_version="2024-02-01",
+            )
+        else:
+            token_provider = get_bearer_token_provider(
+                DefaultAzureCredential(),
+                "https://cognitiveservices.azure.com/.default",
+            )
+            _client = AzureOpenAI(
+                azure_endpoint=azure_endpoint,
+                azure_ad_token_provider=token_provider,
+                api_version="2024-02-01",
+            )
+        _model_name = azure_deployment
+        return _client
+
+    openai_key = os.environ.get("OPENAI_API_KEY")
+    if openai_key:
+        _client = OpenAI(api_key=openai_key)
+        _model_name = EMBEDDING_MODEL
+        return _client
+
+    raise ValueError(
+        "No embedding API configured. Set either:\n"
+        "  - AZURE_OPENAI_ENDPOINT + AZURE_OPENAI_EMBEDDING_DEPLOYMENT\n"
+        "  - OPENAI_API_KEY"
+    )
+
+
+def _embed_query(text: str) -> np.ndarray:
+    """Embed a query and return it as a unit-length float32 vector."""
+    client = _get_client()
+    response = client.embeddings.create(input=text, model=_model_name)
+    vec = np.asarray(response.data[0].embedding, dtype=np.float32)
+    vec /= np.linalg.norm(vec) + 1e-12
+    return vec
+
+
+def load_search_index(force_refresh: bool = False) -> int:
+    """Load chunk embeddings and metadata into the in-process index.
+
+    One SQL pass stacks every stored embedding into a float16 matrix;
+    subsequent searches never touch the database for scoring. Vectors
+    come back as raw little-endian float32 (embedding_bin) and go
+    straight into numpy - only legacy rows written as JSON text pay a
+    decode. Embeddings are unit-normalized at write time
+    (functions/shared/embeddings.py), so inner product equals cosine
+    and only rows written before that change need re-normalizing here.
+    Returns the number of indexed chunks.
+    """
+    global _index
+
+    if _index is not None and not force_refresh:
+        return len(_index[0])
+
+    with _search_cursor() as cursor:
+        cursor.execute(_INDEX_LOAD_SQL)
+
+        metas = []
+        vectors = []
+        for row in cursor.fetchall():
+            raw = row[7]
+            if raw is not None:
+                vectors.append(np.frombuffer(raw, dtype="<f4"))
+            else:
+                vectors.append(np.asarray(json.loads(row[8]), dtype=np.float32))
+
+            metas.append({
+                "chunk_id": row[0],
+                "text": row[1],
+                "section": row[2],
+                "page_start": row[3],
+                "page_end": row[4],
+                "title": row[5],
+                "author": row[6],
+            })
+
+    if vectors:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        # Re-normalize only legacy rows stored before write-time
+        # normalization; freshly written embeddings pass untouched
+        norms = np.linalg.norm(matrix, axis=1)
+        stale = np.abs(norms - 1.0) > 1e-3
+        if stale.any():
+            matrix[stale] /= norms[stale, None] + 1e-12
+        # Sign bits packed to 192 bytes per chunk - the shortlist stage
+        # ranks on Hamming distance over these before exact reranking
+        bits = np.packbits(matrix >= 0, axis=1)
+        matrix = matrix.astype(np.float16)
+    else:
+        matrix = np.empty((0, EMBEDDING_DIM), dtype=np.float16)
+        bits = np.empty((0, EMBEDDING_DIM // 8), dtype=np.uint8)
+    _index = (metas, matrix, bits)
+    return len(metas)
+
+
+def _score_block_rows(n_rows: int) -> int:
+    """Pick the scoring block size for an index of n_rows chunks.
+
+    A fixed size is wrong at both ends: a small corpus fits in one
+    block and should not pay per-block loop overhead, while a large one
+    needs the float32 upcast buffer capped. Between the clamps the size
+    scales with sqrt(N) - the same shape as the IVF lists ~ sqrt(rows)
+    sizing rule. Pin it via SEARCH_SCORE_BLOCK_ROWS for benchmarking.
+    """
+    if SEARCH_SCORE_BLOCK_ROWS > 0:
+        return SEARCH_SCORE_BLOCK_ROWS
+    if n_rows <= MAX_SCORE_BLOCK_ROWS:
+        return max(n_rows, 1)
+    return max(MIN_SCORE_BLOCK_ROWS, min(MAX_SCORE_BLOCK_ROWS, 32 * math.isqrt(n_rows)))
+
+
+def _score_chunks(matrix: np.ndarray, query_vec: np.ndarray) -> np.ndarray:
+    """Cosine scores of the query against every indexed chunk."""
+    block_rows = _score_block_rows(matrix.shape[0])
+    scores = np.empty(matrix.shape[0], dtype=np.float32)
+    for i0 in range(0, matrix.shape[0], block_rows):
+        block = matrix[i0:i0 + block_rows].astype(np.float32)
+        scores[i0:i0 + block.shape[0]] = block @ query_vec
+    return scores
+
+
+def semantic_search(
+    query: str,
+    limit: int = DEFAULT_LIMIT,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[dict]:
+    """Find the chunks most semantically similar to a query.
+
+    Args:
+        query: Natural-language search text
+        limit: Maximum results to return
+        threshold: Minimum cosine similarity to include
+
+    Returns:
+        Result dicts (chunk metadata plus 'similarity'), best first
+    """
+    load_search_index()
+    metas, matrix, bits = _index
+
+    if not metas:
+        return []
+
+    query_vec = _embed_query(query)
+    return _search(metas, matrix, bits, query_vec, limit, threshold)
+
+
+def _binary_shortlist(bits: np.ndarray, query_vec: np.ndarray, size: int) -> np.ndarray:
+    """Indices of the size chunks nearest the query by Hamming distance.
+
+    XOR plus a byte-wise popcount over 192 packed sign bytes replaces
+    1536 multiply-adds per chunk - roughly a 10-20x cheaper first pass
+    at similar top-K recall once the exact rerank runs behind it.
+    """
+    query_bits = np.packbits(query_vec >= 0)
+    distances = _POPCOUNT[np.bitwise_xor(bits, query_bits)].sum(axis=1, dtype=np.int32)
+    if size >= distances.size:
+        return np.arange(distances.size)
+    return np.argpartition(distances, size)[:size]
+
+
+def _search(
+    metas: list[dict],
+    matrix: np.ndarray,
+    bits: np.ndarray,
+    query_vec: np.ndarray,
+    limit: int,
+    threshold: float,
+) -> list[dict]:
+    """Score, threshold, and rank chunks for an embedded query.
+
+    Large indexes run two stages: a Hamming shortlist over packed sign
+    bits narrows to limit * BINARY_SHORTLIST_FACTOR candidates, then
+    exact cosine reranks just those rows. Small indexes scan exactly.
+    """
+    if matrix.shape[0] > BINARY_SHORTLIST_CUTOFF:
+        rows = _binary_shortlist(bits, query_vec, limit * BINARY_SHORTLIST_FACTOR)
+        scores = _score_chunks(matrix[rows], query_vec)
+    else:
+        rows = None
+        scores = _score_chunks(matrix, query_vec)
+
+    # Threshold first so ranking only touches qualifying rows, then
+    # select the top limit with a partial partition - O(N + k log k)
+    # instead of a full O(N log N) sort of every chunk
+    candidates = np.flatnonzero(scores >= threshold)
+    if candidates.size == 0:
+        return []
+    if candidates.size > limit:
+        top = np.argpartition(scores[candidates], -limit)[-limit:]
+        candidates = candidates[top]
+    order = candidates[np.argsort(scores[candidates])[::-1]]
+
+    if rows is not None:
+        return [
+            {**metas[int(rows[int(i)])], "similarity": float(scores[i])} for i in order
+        ]
+    return [{**metas[int(i)], "similarity": float(scores[i])} for i in order]
+
+
+def keyword_search(query: str, limit: int = DEFAULT_LIMIT) -> list[dict]:
+    """Full-text keyword search over chunk text and section headings.
+
+    Ranks against the persisted full-text index (created by init_db),
+    so tokenization happened once at write time - the query does no
+    per-row text processing. FREETEXTTABLE takes natural-language
+    input, the closest analog to a web-style search box. Section
+    matches are weighted above body matches (SECTION_RANK_BOOST), so a
+    chunk whose heading names the topic outranks one that merely
+    mentions it.
+    """
+    with _search_cursor() as cursor:
+        cursor.execute(_KEYWORD_SEARCH_SQL, (limit, query, query))
+
+        return [
+            {
+                "chunk_id": row[0],
+                "text": row[1],
+                "section": row[2],
+                "page_start": row[3],
+                "page_end": row[4],
+                "title": row[5],
+                "author": row[6],
+                "rank": row[7],
+            }
+            for row in cursor.fetchall()
+        ]
+
+
+# RRF constant: dampens the head of each ranking so agreement between
+# rankers outweighs any single first place
+RRF_K = 60
+
+
+def hybrid_search(
+    query: str,
+    limit: int = DEFAULT_LIMIT,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[dict]:
+    """Combine semantic and keyword search with reciprocal rank fusion.
+
+    Each ranker contributes 1 / (RRF_K + rank) per chunk, so chunks
+    that both rankers surface rise above ones only a single ranker
+    likes. Both sides fetch a deeper slate (2x limit) to give the
+    fusion overlap to work with. The semantic side scores in-process
+    against the cached index, so the whole call costs one embedding
+    request plus the single keyword round-trip.
+    """
+    slate = limit * 2
+    semantic = semantic_search(query, limit=slate, threshold=threshold)
+    keyword = keyword_search(query, limit=slate)
+
+    results: dict[int, dict] = {}
+    scores: dict[int, float] = {}
+    for ranking in (semantic, keyword):
+        for rank, result in enumerate(ranking):
+            cid = result["chunk_id"]
+            results.setdefault(cid, result)
+            scores[cid] = scores.get(cid, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+    ordered = sorted(scores, key=scores.get, reverse=True)[:limit]
+    return [{**results[cid], "rrf_score": scores[cid]} for cid in ordered]
+
+
+# Cache hit when a stored query embedding is at least this similar
+QUERY_CACHE_SIMILARITY = 0.97
+
+# Least-used rows are evicted once the cache grows past this size
+QUERY_CACHE_MAX_ROWS = 1000
+
+
+def cached_semantic_search(
+    query: str,
+    limit: int = DEFAULT_LIMIT,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[dict]:
+    """Semantic search behind a near-duplicate query cache.
+
+    Embeds the query once, then looks for a previously cached query
+    whose embedding is nearly identical (cosine >= 0.97) - rephrasings
+    of the same question land here. A hit returns the stored results
+    after one scan over at most QUERY_CACHE_MAX_ROWS cache rows instead
+    of every chunk, and bumps the row's hit counter. A miss runs the
+    full search, stores the result, and evicts the least-used rows once
+    the cache is over size.
+    """
+    load_search_index()
+    metas, matrix, bits = _index
+
+    if not metas:
+        return []
+
+    query_vec = _embed_query(query)
+
+    with _search_cursor(commit=True) as cursor:
+        cursor.execute(_CACHE_LOOKUP_SQL)
+        rows = cursor.fetchall()
+        if rows:
+            cached_vecs = np.asarray(
+                [json.loads(row[1]) for row in rows], dtype=np.float32
+            )
+            scores = cached_vecs @ query_vec
+            best = int(np.argmax(scores))
+            if scores[best] >= QUERY_CACHE_SIMILARITY:
+                cursor.execute(_CACHE_HIT_SQL, (rows[best][0],))
+                return json.loads(rows[best][2])
+
+    results = _search(metas, matrix, bits, query_vec, limit, threshold)
+
+    with _search_cursor(commit=True) as cursor:
+        cursor.execute(
+            _CACHE_INSERT_SQL,
+            (json.dumps(query_vec.tolist()), json.dumps(results)),
+        )
+        cursor.execute("SELECT COUNT(*) FROM query_cache")
+        overflow = cursor.fetchone()[0] - QUERY_CACHE_MAX_ROWS
+        if overflow > 0:
+            cursor.execute(_CACHE_EVICT_SQL, (overflow,))
+
+    return results
@@ -166,7 +166,8 @@ def ingest_document(blob: func.InputStream) -> None:
             ctx["bytes_read"] = len(content)
 
         # 4. Validate magic bytes (security: ensure it's really a PDF)
-        magic_result = validate_pdf_magic_bytes(content)
+        # memoryview avoids copying the blob just to inspect 5 bytes
+        magic_result = validate_pdf_magic_bytes(memoryview(content))
         if not magic_result.is_valid:
             structured_logger.error(
                 "validate",
@@ -335,26 +336,32 @@ def process_pending_chunks(timer: func.TimerRequest) -> None:
        (only after embeddings are complete)
     3. Update source status to COMPLETE when all chunks are done
     """
+    import random
     import time
+    from concurrent.futures import ThreadPoolExecutor, as_completed
 
     from shared.chunker import Chunk
     from shared.concepts import extract_concepts_from_chunk
+    from shared.db.connection import warmup
     from shared.embeddings import get_embedding
     from shared.graph import store_chunk_extraction_standalone
     from shared.logging_utils import structured_logger
     from shared.storage import (
         check_source_complete,
-        get_pending_concept_chunks,
-        get_pending_embedding_chunks,
+        claim_pending_concept_chunks,
+        claim_pending_embedding_chunks,
         get_processing_stats,
+        requeue_stale_claims,
         update_chunk_concept_status,
-        update_chunk_embedding,
         update_chunk_embedding_failed,
+        update_chunk_embeddings_batch,
         update_source_status,
     )
 
     start_time = time.time()
     MAX_RUNTIME_SECONDS = 540  # 9 minutes (leave 1 min buffer before 10 min timeout)
+    MAX_CONCURRENT_EMBEDDINGS = 8  # bounded fan-out of the I/O-bound API calls
+    EMBEDDING_WAVE_SIZE = 50  # chunks per wave = one batched DB write per wave
 
     structured_logger.info(
         "timer",
@@ -362,6 +369,15 @@ def process_pending_chunks(timer: func.TimerRequest) -> None:
         is_past_due=timer.past_due,
     )
 
+    # Pre-touch the hot poll indexes after a cold start (no-op unless
+    # SQL_WARMUP=1), so the polls below hit warm buffer-pool pages
+    warmup()
+
+    # === RECLAIM ABANDONED WORK ===
+    # Chunks a dead worker left in PROCESSING go back to PENDING
+    # before the stats check, so they count as pending work again
+    requeue_stale_claims()
+
     # === EARLY EXIT CHECK ===
     stats = get_processing_stats()
     pending_embeddings = stats.get("pending_embeddings", 0)
@@ -395,45 +411,66 @@ def process_pending_chunks(timer: func.TimerRequest) -> None:
             pending=pending_embeddings,
         )
 
-        # Get batch of pending chunks
-        pending_chunks = get_pending_embedding_chunks(limit=500)
-
-        for chunk_data in pending_chunks:
-            # Check if we're running out of time
-            elapsed = time.time() - start_time
-            if elapsed > MAX_RUNTIME_SECONDS:
-                structured_logger.info(
-                    "timer",
-                    "Approaching timeout - stopping embedding phase",
-                    elapsed_seconds=elapsed,
-                    embeddings_processed=embeddings_processed,
-                )
-                break
-
-            try:
-                # Generate embedding
-                embedding = get_embedding(chunk_data["text"])
-
-                # Update chunk with embedding
-                update_chunk_embedding(chunk_data["id"], embedding)
-
-                embeddings_processed += 1
-                processed_source_ids.add(chunk_data["source_id"])
-
-                if embeddings_processed % 50 == 0:
+        # Claim a batch of pending chunks (atomically flipped to
+        # PROCESSING, so overlapping runs cannot double-process)
+        pending_chunks = claim_pending_embedding_chunks(limit=500)
+
+        def embed_one(chunk_data: dict) -> tuple[dict, list[float]]:
+            """Generate one embedding, with a small start jitter so a
+            wave of concurrent calls doesn't hit the API in lockstep
+            (which tends to trip 429 rate limits all at once)."""
+            time.sleep(random.uniform(0.0, 0.25))
+            return chunk_data, get_embedding(chunk_data["text"])
+
+        # Fan out the API calls (I/O-bound, same bounded-worker pattern
+        # as concept extraction in graph.py) one wave at a time, then
+        # write each wave's embeddings back in a single batched update.
+        # The timeout check sits between waves, so a break never strands
+        # completed embeddings in memory.
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_EMBEDDINGS) as executor:
+            for wave_start in range(0, len(pending_chunks), EMBEDDING_WAVE_SIZE):
+                # Check if we're running out of time
+                elapsed = time.time() - start_time
+                if elapsed > MAX_RUNTIME_SECONDS:
                     structured_logger.info(
                         "timer",
-                        f"Embedded {embeddings_processed} chunks",
+                        "Approaching timeout - stopping embedding phase",
+                        elapsed_seconds=elapsed,
                         embeddings_processed=embeddings_processed,
                     )
-
-            except Exception as e:
-                # Mark as failed, will retry up to 3 times
-                update_chunk_embedding_failed(chunk_data["id"], str(e)[:500])
-                structured_logger.warning(
+                    break
+
+                wave = pending_chunks[wave_start:wave_start + EMBEDDING_WAVE_SIZE]
+                futures = {
+                    executor.submit(embed_one, chunk_data): chunk_data
+                    for chunk_data in wave
+                }
+
+                embedding_buffer: list[tuple[int, list[float]]] = []
+                for future in as_completed(futures):
+                    chunk_data = futures[future]
+                    try:
+                        _, embedding = future.result()
+                        embedding_buffer.append((chunk_data["id"], embedding))
+
+                        embeddings_processed += 1
+                        processed_source_ids.add(chunk_data["source_id"])
+
+                    except Exception as e:
+                        # Mark as failed, will retry up to 3 times
+                        update_chunk_embedding_failed(chunk_data["id"], str(e)[:500])
+                        structured_logger.warning(
+                            "timer",
+                            f"Embedding failed for chunk {chunk_data['id']}",
+                            error=str(e),
+                        )
+
+                # One transaction per wave instead of one commit per chunk
+                update_chunk_embeddings_batch(embedding_buffer)
+                structured_logger.info(
                     "timer",
-                    f"Embedding failed for chunk {chunk_data['id']}",
-                    error=str(e),
+                    f"Embedded {embeddings_processed} chunks",
+                    embeddings_processed=embeddings_processed,
                 )
 
         structured_logger.info(
@@ -451,8 +488,9 @@ def process_pending_chunks(timer: func.TimerRequest) -> None:
             pending=pending_concepts,
         )
 
-        # Get batch of pending chunks (only those with embeddings complete)
-        pending_chunks = get_pending_concept_chunks(limit=200)
+        # Claim a batch of pending chunks (only those with embeddings
+        # complete), atomically flipped to PROCESSING
+        pending_chunks = claim_pending_concept_chunks(limit=200)
 
         for chunk_data in pending_chunks:
             # Check if we're running out of time
@@ -477,16 +515,15 @@ def process_pending_chunks(timer: func.TimerRequest) -> None:
                 )
                 chunk.id = chunk_data["id"]
 
-                # Store extraction results (concepts, mentions, relationships)
+                # Store extraction results (concepts, mentions,
+                # relationships) and mark the chunk EXTRACTED - one
+                # transaction, one commit
                 store_chunk_extraction_standalone(
                     source_id=chunk_data["source_id"],
                     chunk=chunk,
                     extraction=extraction,
                 )
 
-                # Mark chunk as extracted
-                update_chunk_concept_status(chunk_data["id"], "EXTRACTED")
-
                 concepts_processed += 1
                 processed_source_ids.add(chunk_data["source_id"])
 
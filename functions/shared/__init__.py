@@ -34,7 +34,13 @@ from .graph import (
     store_chunk_extraction,
 )
 from .logging_utils import StructuredLogger, structured_logger
-from .parser import PageContent, ParsedDocument, detect_file_type, parse_pdf
+from .parser import (
+    PageContent,
+    ParsedDocument,
+    detect_file_type,
+    parse_pdf,
+    parse_pdf_async,
+)
 from .storage import (
     get_chunks_for_source,
     get_source_by_path,
@@ -63,6 +69,7 @@ __all__ = [
     "PageContent",
     "ParsedDocument",
     "parse_pdf",
+    "parse_pdf_async",
     "detect_file_type",
     # Chunker
     "Chunk",
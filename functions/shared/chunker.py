@@ -42,25 +42,30 @@ def chunk_document(
     chunks = []
     position = 0
 
-    for page in doc.pages:
-        if not page.text.strip():
+    # Walk the document's parallel page lists directly (no per-page
+    # PageContent objects needed here)
+    for page_num, text, headings in zip(
+        doc.page_nums, doc.page_texts, doc.page_headings
+    ):
+        if not text.strip():
             continue
 
+        section = headings[0] if headings else None
+
         # If page fits in one chunk, use it as-is
-        if len(page.text) <= max_chunk_size:
-            section = page.headings[0] if page.headings else None
+        if len(text) <= max_chunk_size:
             chunks.append(Chunk(
-                text=page.text,
+                text=text,
                 position=position,
-                page_start=page.page_num,
-                page_end=page.page_num,
+                page_start=page_num,
+                page_end=page_num,
                 section=section,
             ))
             position += 1
         else:
             # Split large pages into smaller chunks
             page_chunks = chunk_by_size(
-                page.text,
+                text,
                 chunk_size=max_chunk_size,
                 overlap=overlap,
             )
@@ -68,9 +73,9 @@ def chunk_document(
                 chunks.append(Chunk(
                     text=chunk_text,
                     position=position,
-                    page_start=page.page_num,
-                    page_end=page.page_num,
-                    section=page.headings[0] if page.headings else None,
+                    page_start=page_num,
+                    page_end=page_num,
+                    section=section,
                 ))
                 position += 1
 
@@ -1,36 +1,94 @@
 """Database connection utilities for Azure SQL."""
 
+import atexit
 import os
 import struct
+import threading
+import time
 from contextlib import contextmanager
-from typing import Generator
+from functools import lru_cache
+from typing import Generator, Iterable, Sequence
 
 import pyodbc
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Reuse ODBC connections across get_connection() calls. Each fresh
+# Azure SQL connection costs a TCP+TLS handshake (plus an AAD token
+# exchange under managed identity), hundreds of ms that pooling turns
+# into a hash lookup. Must be set before the first connection.
+pyodbc.pooling = True
+
+
+# AAD auth state, shared across connections. DefaultAzureCredential
+# probes ~6 credential sources (env vars, IMDS, CLI, ...) every time
+# it is built; in Azure the runtime is known, so ManagedIdentityCredential
+# goes straight to IMDS. The packed token is reused until shortly
+# before expiry instead of hitting IMDS once per connection.
+_credential = None
+_token_cache: tuple[bytes, float] | None = None  # (packed token, expires_on)
+_TOKEN_REFRESH_MARGIN_SECONDS = 300
+
+
+def _get_credential():
+    """Get or create the AAD credential for database tokens.
+
+    Uses ManagedIdentityCredential directly; set AZURE_AUTH_MODE=dev to
+    fall back to the full DefaultAzureCredential chain (Azure CLI,
+    VS Code, ...) for local development against Azure SQL.
+    """
+    global _credential
+    if _credential is None:
+        if os.environ.get("AZURE_AUTH_MODE", "").lower() == "dev":
+            from azure.identity import DefaultAzureCredential
+
+            _credential = DefaultAzureCredential()
+        else:
+            from azure.identity import ManagedIdentityCredential
+
+            _credential = ManagedIdentityCredential()
+    return _credential
+
 
 def _get_managed_identity_token() -> bytes:
     """Get Azure AD token for managed identity authentication.
 
     Used when running in Azure (Function App, Container Apps).
-    Returns token in the format required by pyodbc.
+    Returns token in the format required by pyodbc, cached until five
+    minutes before expiry.
     """
-    from azure.identity import DefaultAzureCredential
+    global _token_cache
+
+    if _token_cache is not None:
+        packed, expires_on = _token_cache
+        if expires_on - time.time() > _TOKEN_REFRESH_MARGIN_SECONDS:
+            return packed
 
-    credential = DefaultAzureCredential()
-    token = credential.get_token("https://database.windows.net/.default")
+    token = _get_credential().get_token("https://database.windows.net/.default")
 
     # Convert token to bytes format required by pyodbc
     token_bytes = token.token.encode("utf-16-le")
     token_struct = struct.pack(f"<I{len(token_bytes)}s", len(token_bytes), token_bytes)
+    _token_cache = (token_struct, token.expires_on)
     return token_struct
 
 
+@lru_cache(maxsize=1)
 def get_connection_string() -> str:
-    """Build Azure SQL connection string from environment variables."""
-    server = os.environ.get("AZURE_SQL_SERVER", "")
+    """Build Azure SQL connection string from environment variables.
+
+    Built once per process - the environment is fixed after
+    load_dotenv, so every connection reuses the cached string, and a
+    missing server fails here with a clear message instead of as a
+    cryptic ODBC error on connect. Tests that monkeypatch the
+    environment can call get_connection_string.cache_clear().
+    """
+    server = os.environ.get("AZURE_SQL_SERVER")
+    if not server:
+        raise RuntimeError(
+            "AZURE_SQL_SERVER is not set - check your .env file"
+        )
     database = os.environ.get("AZURE_SQL_DATABASE", "secondbrain")
 
     # Base connection string
@@ -50,6 +108,18 @@ def get_connection() -> pyodbc.Connection:
 
     Uses managed identity when running in Azure (AZURE_SQL_USE_MI=true),
     otherwise falls back to SQL authentication for local development.
+
+    Prefer get_db_connection, which checks connections out of the
+    module pool instead of paying the handshake every call; this stays
+    as the escape hatch for callers that need an unpooled connection
+    (autocommit DDL, ownership past process exit).
+
+    Deliberately issues no per-session setup statements: graph queries
+    use built-in SQL Graph (no extension to load or schema path to
+    set), and Azure SQL ships read-committed snapshot on by default,
+    so a new connection is query-ready in zero extra round-trips. Keep
+    it that way - any session default worth setting belongs on the
+    database, not here.
     """
     conn_str = get_connection_string()
     use_managed_identity = os.environ.get("AZURE_SQL_USE_MI", "false").lower() == "true"
@@ -68,27 +138,237 @@ def get_connection() -> pyodbc.Connection:
     return conn
 
 
+# Module-level connection pool. get_db_cursor wraps every query in
+# the codebase, so without pooling each of those calls pays the full
+# TCP+TLS+auth handshake (~50-150ms to Azure SQL) before running any
+# SQL. Connections returned cleanly are kept for reuse, up to
+# SQL_POOL_MAX idle; anything that raised is closed rather than
+# recycled, since the socket itself may be the problem.
+_POOL_MAX = int(os.environ.get("SQL_POOL_MAX", "10"))
+_pool: list[pyodbc.Connection] = []
+_pool_lock = threading.Lock()
+
+
+def _pool_get() -> pyodbc.Connection:
+    """Check a connection out of the pool, connecting if it is empty."""
+    with _pool_lock:
+        if _pool:
+            return _pool.pop()
+    return get_connection()
+
+
+def _pool_put(conn: pyodbc.Connection, close: bool = False) -> None:
+    """Return a connection to the pool, or close it if asked/full.
+
+    Connections go back with their session state intact:
+    sp_reset_connection is a TDS-level feature the driver owns, not a
+    statement we can issue, and an extra reset round-trip per checkin
+    would cost what the pool exists to save. The rule is therefore
+    that callers clean up what they create - in particular, anything
+    creating a temp table must DROP TABLE IF EXISTS it first, since
+    temp tables are session-scoped and survive checkin (see
+    bulk_update_from_values and CREATE_EMBEDDING_STAGE).
+    """
+    if not close:
+        with _pool_lock:
+            if len(_pool) < _POOL_MAX:
+                _pool.append(conn)
+                return
+    try:
+        conn.close()
+    except pyodbc.Error:
+        pass
+
+
+def _pool_close_all() -> None:
+    """Close every idle pooled connection (registered at exit)."""
+    with _pool_lock:
+        while _pool:
+            try:
+                _pool.pop().close()
+            except pyodbc.Error:
+                pass
+
+
+atexit.register(_pool_close_all)
+
+
 @contextmanager
 def get_db_connection() -> Generator[pyodbc.Connection, None, None]:
-    """Context manager for database connections."""
-    conn = get_connection()
+    """Context manager for pooled database connections.
+
+    A clean exit returns the connection to the pool for the next
+    caller; an exception closes it instead, so broken sockets are
+    never recycled.
+    """
+    conn = _pool_get()
     try:
         yield conn
-    finally:
-        conn.close()
+    except Exception:
+        _pool_put(conn, close=True)
+        raise
+    else:
+        _pool_put(conn)
 
 
 @contextmanager
-def get_db_cursor(commit: bool = True):
-    """Context manager for database cursor with automatic commit."""
+def get_db_cursor(commit: bool = True, durable: bool = True):
+    """Context manager for database cursor with automatic commit.
+
+    Transaction finalization rides on pyodbc's native connection
+    context manager, which commits on success and rolls back on
+    exception in C instead of through Python-level commit/rollback
+    branches. commit=False rolls back before exit so read-only callers
+    release their snapshot rather than committing it; a connection
+    that raised is closed by get_db_connection, never re-pooled.
+
+    durable=False commits with DELAYED_DURABILITY = ON: the commit
+    returns once the log record is in memory instead of waiting for
+    the log flush, removing the per-commit flush wait from bulk
+    ingest writes. Only use it for replayable data - chunks and
+    embeddings, where the source blob is the durable copy and the
+    status columns make reprocessing free. Source state-machine
+    writes must keep the durable default. Takes effect only if the
+    database has DELAYED_DURABILITY = ALLOWED; when it is left
+    DISABLED (the default) the option is ignored and commits stay
+    fully durable, so this is always safe to request.
+    """
     with get_db_connection() as conn:
         cursor = conn.cursor()
+        # Array-bind executemany parameters into bulk TDS batches
+        # instead of one round-trip per row
+        cursor.fast_executemany = True
         try:
-            yield cursor
-            if commit:
-                conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
+            with conn:
+                yield cursor
+                if not commit:
+                    conn.rollback()
+                elif not durable:
+                    # Commit the implicit transaction here with relaxed
+                    # durability; the context exit then commits an
+                    # empty transaction, which is a no-op.
+                    cursor.execute(
+                        "IF @@TRANCOUNT > 0 "
+                        "COMMIT TRANSACTION WITH (DELAYED_DURABILITY = ON)"
+                    )
         finally:
             cursor.close()
+
+
+def warmup() -> None:
+    """Pre-touch the hot poll indexes on a cold start.
+
+    After an idle spell the worker-poll indexes (pending embedding /
+    pending concept / sources status / concept names) may have fallen
+    out of the buffer pool, so the first poll after an Azure Functions
+    cold start pays a page-read storm on top of its round-trip. Azure
+    SQL has no pg_prewarm equivalent; an index-hinted covering scan of
+    each index pulls its pages through the buffer pool the same way.
+    The scans cost O(pending work), which the filtered indexes keep
+    small, and the first one also pays the process-side cold costs
+    (pooled connection, TLS handshake, AAD token) before real work.
+
+    Guarded by SQL_WARMUP=1 - the scans are wasted effort for
+    short-lived local scripts, so warming is opt-in for the deployed
+    function app. Each hint names a filtered index with its own
+    predicate, so the queries are index-only and cannot fall back to
+    a base-table scan.
+    """
+    if os.environ.get("SQL_WARMUP", "").lower() not in ("1", "true"):
+        return
+
+    statements = (
+        "SELECT COUNT(*) FROM chunks WITH (INDEX(IX_chunks_pending_embedding)) "
+        "WHERE embedding_status = 0",
+        "SELECT COUNT(*) FROM chunks WITH (INDEX(IX_chunks_pending_concept)) "
+        "WHERE concept_status = 0 AND embedding_status = 1 "
+        "AND extraction_attempts < 3",
+        "SELECT COUNT(*) FROM sources WITH (INDEX(IX_sources_status))",
+        "SELECT COUNT(*) FROM concepts WITH (INDEX(UQ_concepts_name_ci)) "
+        "WHERE name_ci IS NOT NULL",
+    )
+    with get_db_cursor(commit=False) as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+            cursor.fetchone()
+
+
+def bulk_insert(
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence],
+    chunk_size: int = 500,
+    durable: bool = True,
+) -> int:
+    """Insert many rows in array-bound batches of chunk_size.
+
+    The write primitive for high-volume paths: N rows cost
+    ceil(N / chunk_size) round-trips instead of one per row, with each
+    batch shipped as a single bulk TDS message. The chunk size caps
+    the driver's parameter buffer, not correctness. table and columns
+    are interpolated into the statement - pass code constants, never
+    user input. durable=False relaxes the commit for replayable data
+    (see get_db_cursor).
+
+    Returns the number of rows inserted.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+    with get_db_cursor(commit=True, durable=durable) as cursor:
+        for i in range(0, len(rows), chunk_size):
+            cursor.executemany(sql, rows[i:i + chunk_size])
+    return len(rows)
+
+
+def bulk_update_from_values(
+    table: str,
+    key_column: str,
+    set_columns: Sequence[str],
+    column_types: Sequence[str],
+    rows: Iterable[Sequence],
+    durable: bool = True,
+) -> int:
+    """Update many rows from staged values in one statement.
+
+    Stages (key, values...) tuples into a temp table with array-bound
+    inserts, then applies a single UPDATE...JOIN - three round-trips
+    regardless of row count, versus one UPDATE per row.
+    column_types supplies the SQL type of the key column and each set
+    column, in order, for the temp table definition. Identifiers are
+    interpolated - pass code constants, never user input.
+    durable=False relaxes the commit for replayable data (see
+    get_db_cursor).
+
+    Returns the number of rows updated.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    all_columns = [key_column, *set_columns]
+    col_defs = ", ".join(
+        f"{col} {sql_type}" for col, sql_type in zip(all_columns, column_types)
+    )
+    placeholders = ", ".join("?" for _ in all_columns)
+    assignments = ", ".join(f"t.{col} = s.{col}" for col in set_columns)
+
+    with get_db_cursor(commit=True, durable=durable) as cursor:
+        # Temp tables are session-scoped and the pool recycles live
+        # sessions, so a previous call's #stage may still exist on
+        # this connection - drop it first or the CREATE fails (2714)
+        cursor.execute(
+            f"DROP TABLE IF EXISTS #stage; "
+            f"CREATE TABLE #stage ({col_defs}, PRIMARY KEY ({key_column}))"
+        )
+        cursor.executemany(f"INSERT INTO #stage VALUES ({placeholders})", rows)
+        cursor.execute(
+            f"UPDATE t SET {assignments} "
+            f"FROM {table} t JOIN #stage s ON s.{key_column} = t.{key_column}"
+        )
+        return cursor.rowcount
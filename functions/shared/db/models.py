@@ -5,7 +5,12 @@ Uses SQL Graph syntax with MATCH queries for graph traversal.
 
 Tables:
     NODE: sources, chunks, concepts
-    EDGE: from_source, covers, mentions, related_to
+    EDGE: covers, mentions, related_to
+
+Vendored copy of shared/db/models.py: the function app deploys only
+functions/, so it cannot import from the repo root. shared/db/models.py
+is canonical (init_db executes that one) - edit it there and mirror the
+change here.
 """
 
 # Processing states for document lifecycle
@@ -19,7 +24,24 @@ PROCESSING_STATES = [
     "EXTRACT_FAILED",  # Concept extraction failed
 ]
 
-# SQL Schema for Azure SQL Graph
+# Numeric codes for the status columns. The columns are TINYINT: 1 byte
+# per row per column instead of up to 30 as NVARCHAR, which matters most
+# in the filtered index predicates and the GROUP BY stats query. The
+# string labels stay the Python-facing vocabulary - callers keep passing
+# 'COMPLETE' etc. and storage maps to codes at the SQL boundary; the
+# status_labels table and sources_with_status view give the same
+# readability in ad-hoc SQL. Source codes follow PROCESSING_STATES order.
+SOURCE_STATUS_CODES = {name: code for code, name in enumerate(PROCESSING_STATES)}
+EMBEDDING_STATUS_CODES = {"PENDING": 0, "COMPLETE": 1, "FAILED": 2, "PROCESSING": 3}
+CONCEPT_STATUS_CODES = {"PENDING": 0, "EXTRACTED": 1, "FAILED": 2, "PROCESSING": 3}
+
+SOURCE_STATUS_LABELS = {code: name for name, code in SOURCE_STATUS_CODES.items()}
+EMBEDDING_STATUS_LABELS = {code: name for name, code in EMBEDDING_STATUS_CODES.items()}
+CONCEPT_STATUS_LABELS = {code: name for name, code in CONCEPT_STATUS_CODES.items()}
+
+# SQL Schema for Azure SQL Graph.
+# GO lines delimit T-SQL batches: init_db.py executes one batch per
+# round-trip instead of parsing out individual statements.
 SCHEMA_SQL = """
 -- =============================================
 -- NODE TABLES
@@ -34,43 +56,52 @@ CREATE TABLE sources (
     source_type NVARCHAR(50) NOT NULL,  -- 'pdf', 'markdown', 'article'
     file_path NVARCHAR(500) NOT NULL,   -- Unique identifier for idempotency
     page_count INT,
-    status NVARCHAR(50) NOT NULL DEFAULT 'UPLOADED',
+    status TINYINT NOT NULL DEFAULT 0,  -- Code into status_labels (0 = UPLOADED)
     error_message NVARCHAR(MAX),
     metadata NVARCHAR(MAX),             -- JSON for type-specific fields
     created_at DATETIME2 NOT NULL DEFAULT GETDATE(),
     updated_at DATETIME2 NOT NULL DEFAULT GETDATE(),
     CONSTRAINT UQ_sources_file_path UNIQUE (file_path),
-    CONSTRAINT CK_sources_status CHECK (status IN (
-        'UPLOADED', 'PARSING', 'PARSED', 'EXTRACTING',
-        'COMPLETE', 'PARSE_FAILED', 'EXTRACT_FAILED'
-    ))
+    CONSTRAINT CK_sources_status CHECK (status BETWEEN 0 AND 6)
 ) AS NODE;
 
 -- Chunks: text segments from sources
 -- Position is sequential within each source (invariant)
--- Processing status tracked per-chunk for resumable processing
 CREATE TABLE chunks (
     id INT PRIMARY KEY IDENTITY(1,1),
     source_id INT NOT NULL,
     text NVARCHAR(MAX) NOT NULL,
-    position INT NOT NULL,              -- Sequential ordering within source
-    page_start INT,
-    page_end INT,
+    -- Fixed-width columns sized to their actual bounds: position is
+    -- capped at 3000 chunks per source and pages at 2500 (cost
+    -- controls), so SMALLINT halves them vs INT; the retry counter
+    -- maxes at 3, a TINYINT. Narrower row shells pack more rows per
+    -- page for the scan-heavy poll indexes keyed on these columns.
+    position SMALLINT NOT NULL,         -- Sequential ordering within source
+    page_start SMALLINT,
+    page_end SMALLINT,
     section NVARCHAR(500),              -- Heading or chapter name
     char_count INT NOT NULL,            -- For cost tracking
-    embedding NVARCHAR(MAX),            -- OpenAI text-embedding-3-small (JSON string)
-    embedding_status NVARCHAR(20) NOT NULL DEFAULT 'PENDING',  -- PENDING, COMPLETE, FAILED
-    concept_status NVARCHAR(20) NOT NULL DEFAULT 'PENDING',    -- PENDING, EXTRACTED, FAILED
-    extraction_error NVARCHAR(500),     -- Error message if extraction failed
-    extraction_attempts INT NOT NULL DEFAULT 0,  -- Retry counter
+    -- No ANN index over the embeddings: Azure SQL has no HNSW/IVF
+    -- index type (and no VECTOR type on Basic tier). Sub-linear
+    -- search lives in the app instead - the resident matrix in
+    -- app/controllers/search.py prefilters with packed sign bits and
+    -- Hamming distance, then reranks exactly. Revisit if the tier
+    -- ever grows a native vector index.
+    embedding NVARCHAR(MAX),             -- Legacy JSON encoding (rows written before embedding_bin)
+    embedding_bin VARBINARY(6144),       -- 1536 x little-endian FP32; 6 KB vs ~24 KB as UTF-16 JSON
+    embedding_status TINYINT NOT NULL DEFAULT 0,  -- 0 PENDING, 1 COMPLETE, 2 FAILED, 3 PROCESSING
+    concept_status TINYINT NOT NULL DEFAULT 0,    -- 0 PENDING, 1 EXTRACTED, 2 FAILED, 3 PROCESSING
+    claimed_at DATETIME2,               -- Set on claim; stale claims requeue
+    extraction_attempts TINYINT NOT NULL DEFAULT 0,             -- Retry counter (max 3)
+    extraction_error NVARCHAR(500),                             -- Last error message
     metadata NVARCHAR(MAX),             -- JSON for additional fields
     created_at DATETIME2 NOT NULL DEFAULT GETDATE(),
     CONSTRAINT FK_chunks_source FOREIGN KEY (source_id)
         REFERENCES sources(id) ON DELETE CASCADE,
     CONSTRAINT UQ_chunks_position UNIQUE (source_id, position),
     CONSTRAINT CK_chunks_text_not_empty CHECK (LEN(text) > 0),
-    CONSTRAINT CK_chunks_embedding_status CHECK (embedding_status IN ('PENDING', 'COMPLETE', 'FAILED')),
-    CONSTRAINT CK_chunks_concept_status CHECK (concept_status IN ('PENDING', 'EXTRACTED', 'FAILED'))
+    CONSTRAINT CK_chunks_embedding_status CHECK (embedding_status BETWEEN 0 AND 3),
+    CONSTRAINT CK_chunks_concept_status CHECK (concept_status BETWEEN 0 AND 3)
 ) AS NODE;
 
 -- Concepts: extracted topics and ideas (Phase 3)
@@ -78,25 +109,98 @@ CREATE TABLE chunks (
 CREATE TABLE concepts (
     id INT PRIMARY KEY IDENTITY(1,1),
     name NVARCHAR(255) NOT NULL,
+    name_ci AS LOWER(name) PERSISTED,   -- Case-folded key for the unique index
     description NVARCHAR(MAX),
     category NVARCHAR(100),             -- 'methodology', 'principle', 'tool', etc.
-    embedding VECTOR(1536),             -- For concept similarity search
+    embedding NVARCHAR(MAX),             -- Legacy JSON encoding (rows written before embedding_bin)
+    embedding_bin VARBINARY(6144),       -- 1536 x little-endian FP32 (same layout as chunks)
+    embedding_i8 VARBINARY(1536),       -- int8-quantized embedding (4x smaller scans)
+    embedding_scale FLOAT,              -- Per-vector dequantization scale
+    description_sha256 BINARY(32),      -- Content hash of embedded text
     created_at DATETIME2 NOT NULL DEFAULT GETDATE(),
     updated_at DATETIME2 NOT NULL DEFAULT GETDATE()
 ) AS NODE;
 
--- Case-insensitive unique index on concept name
+-- Case-insensitive unique index on concept name. Indexing the
+-- persisted LOWER(name) column actually enforces 'Graphs' = 'graphs'
+-- (a plain index on name would not) and gives the upsert's
+-- name_ci = LOWER(?) predicate an index seek instead of a scan.
 CREATE UNIQUE INDEX UQ_concepts_name_ci
-ON concepts (name)
-WHERE name IS NOT NULL;
+ON concepts (name_ci)
+WHERE name_ci IS NOT NULL;
+
+-- Embeddings cache: keyed by content hash and shared across concepts,
+-- so identical or unchanged descriptions are only embedded once
+CREATE TABLE embeddings_cache (
+    sha256 BINARY(32) PRIMARY KEY,
+    embedding NVARCHAR(MAX) NOT NULL,   -- JSON (same encoding as concepts)
+    created_at DATETIME2 NOT NULL DEFAULT GETDATE()
+);
+
+-- LLM response cache: keyed by a hash of the prompt's concept group,
+-- so incremental analysis runs only pay for changed groups
+CREATE TABLE llm_cache (
+    prompt_sha BINARY(32) PRIMARY KEY,
+    response NVARCHAR(MAX) NOT NULL,    -- JSON relationships array
+    created_at DATETIME2 NOT NULL DEFAULT GETDATE()
+);
+
+-- Semantic query cache: recent search query embeddings and their
+-- result payloads, so near-duplicate queries skip the chunk scan
+CREATE TABLE query_cache (
+    id INT PRIMARY KEY IDENTITY(1,1),
+    query_embedding NVARCHAR(MAX) NOT NULL,  -- JSON, unit-normalized
+    result_json NVARCHAR(MAX) NOT NULL,
+    hits INT NOT NULL DEFAULT 1,
+    created_at DATETIME2 NOT NULL DEFAULT GETDATE()
+);
+
+-- Labels for the TINYINT status codes, per status dimension. The app
+-- never joins this; it exists so ad-hoc queries stay readable.
+CREATE TABLE status_labels (
+    domain NVARCHAR(20) NOT NULL,       -- 'source', 'embedding', 'concept'
+    code TINYINT NOT NULL,
+    label NVARCHAR(20) NOT NULL,
+    PRIMARY KEY (domain, code)
+);
+
+INSERT INTO status_labels (domain, code, label) VALUES
+    ('source', 0, 'UPLOADED'),
+    ('source', 1, 'PARSING'),
+    ('source', 2, 'PARSED'),
+    ('source', 3, 'EXTRACTING'),
+    ('source', 4, 'COMPLETE'),
+    ('source', 5, 'PARSE_FAILED'),
+    ('source', 6, 'EXTRACT_FAILED'),
+    ('embedding', 0, 'PENDING'),
+    ('embedding', 1, 'COMPLETE'),
+    ('embedding', 2, 'FAILED'),
+    ('embedding', 3, 'PROCESSING'),
+    ('concept', 0, 'PENDING'),
+    ('concept', 1, 'EXTRACTED'),
+    ('concept', 2, 'FAILED'),
+    ('concept', 3, 'PROCESSING');
+GO
+
+-- Human-readable source listing for ad-hoc queries (CREATE VIEW must
+-- be alone in its batch)
+CREATE VIEW sources_with_status AS
+SELECT s.id, s.title, s.author, s.source_type, s.file_path,
+       s.page_count, s.status, l.label AS status_label,
+       s.error_message, s.created_at, s.updated_at
+FROM sources s
+JOIN status_labels l ON l.domain = 'source' AND l.code = s.status;
+GO
 
 -- =============================================
 -- EDGE TABLES
 -- =============================================
 
--- from_source: Chunk belongs to Source
--- Redundant with FK but enables graph queries
-CREATE TABLE from_source AS EDGE;
+-- No chunk-to-source edge table: chunks.source_id with its FK and
+-- IX_chunks_source already is that adjacency, in both directions.
+-- A from_source edge existed once and was pure duplication - double
+-- writes and double index maintenance on every chunk insert for a
+-- hop a plain join answers.
 
 -- covers: Source covers Concept (document-level relationship)
 CREATE TABLE covers (
@@ -116,11 +220,32 @@ CREATE TABLE related_to (
     strength FLOAT DEFAULT 1.0,         -- Relationship strength (0-1)
     source_id INT                       -- Which source established this relationship
 ) AS EDGE;
+GO
+
+-- =============================================
+-- COMPRESSION
+-- =============================================
+
+-- Page-compress the two widest node tables. Scans over chunks and
+-- concepts are I/O-bound; compressed pages fit 2-4x more rows per
+-- read and per buffer-pool page. Covers in-row data only - NVARCHAR
+-- (MAX) values pushed off-row (long chunk text) stay uncompressed,
+-- but the status/position/metadata row shells the polls touch all
+-- shrink. CPU cost lands on the write path, which is batch-shaped
+-- here.
+ALTER TABLE chunks REBUILD WITH (DATA_COMPRESSION = PAGE);
+ALTER TABLE concepts REBUILD WITH (DATA_COMPRESSION = PAGE);
+GO
 
 -- =============================================
 -- INDEXES FOR PERFORMANCE
 -- =============================================
 
+-- Sources: no covering index is needed for the search joins that
+-- return title/author - sources rows live in the clustered PK, so the
+-- per-row id lookup already lands on the full row (there is no heap
+-- fetch to avoid on a clustered table)
+
 -- Sources: query by status for processing queue
 CREATE INDEX IX_sources_status ON sources(status);
 
@@ -130,16 +255,118 @@ CREATE INDEX IX_sources_type ON sources(source_type);
 -- Chunks: query by source for retrieval
 CREATE INDEX IX_chunks_source ON chunks(source_id);
 
--- Chunks: query pending embeddings for timer function
-CREATE INDEX IX_chunks_embedding_status ON chunks(embedding_status)
-    WHERE embedding_status = 'PENDING';
-
--- Chunks: query pending concept extraction for timer function
-CREATE INDEX IX_chunks_concept_status ON chunks(concept_status)
-    WHERE concept_status = 'PENDING';
-
 -- Concepts: query by category for browsing
 CREATE INDEX IX_concepts_category ON concepts(category);
+
+-- Chunks: filtered covering index for the timer function's embedding
+-- poll. Shrinks with pending work and serves the query without key
+-- lookups into the base table.
+-- These filtered indexes are also this schema's answer to "partition
+-- the hot slice": the index holds only pending rows and drains with
+-- the queue, so the poll costs O(|pending|) regardless of corpus
+-- size. Real table partitioning would add sliding-window management
+-- for no extra pruning until the corpus is orders of magnitude past
+-- the current few-thousand-chunks-per-source scale.
+CREATE INDEX IX_chunks_pending_embedding ON chunks(source_id, position)
+    INCLUDE (text)
+    WHERE embedding_status = 0;  -- PENDING
+
+-- Chunks: same pattern for the concept-extraction poll. The filter
+-- mirrors the poll's full predicate, so rows whose embeddings aren't
+-- ready or whose retries are exhausted never enter the index at all -
+-- the poll is an index-only range scan over exactly the eligible work
+CREATE INDEX IX_chunks_pending_concept ON chunks(source_id, position)
+    INCLUDE (text)
+    WHERE concept_status = 0         -- PENDING
+      AND embedding_status = 1       -- COMPLETE
+      AND extraction_attempts < 3;
+
+-- Chunks: filtered index over embedded rows so the app's search-index
+-- load enumerates exactly the rows it wants (embedding_status =
+-- COMPLETE, whichever encoding holds the vector) without filtering
+-- through unprocessed chunks; the wide LOB columns come off the
+-- clustered index by id
+CREATE INDEX IX_chunks_embedded ON chunks(source_id, position)
+    WHERE embedding_status = 1;  -- COMPLETE
+
+-- Concepts: covering index for the embedding pass, which reads
+-- name/description/hash for every described concept without
+-- touching the wide embedding columns
+CREATE INDEX IX_concepts_needs_embedding ON concepts(id)
+    INCLUDE (name, description, description_sha256)
+    WHERE description IS NOT NULL;
+
+-- Edge adjacency: SQL Graph stores $from_id/$to_id but indexes
+-- neither, so every MATCH hop is a full edge-table scan. A forward
+-- (from, to) and reverse (to, from) index per edge table turn both
+-- traversal directions into O(log N) seeks; the INCLUDEd edge
+-- payloads let weight-reading traversals answer index-only. Write
+-- traversals to start from the more selective endpoint - the planner
+-- picks the matching direction's index.
+CREATE INDEX IX_covers_fwd ON covers($from_id, $to_id)
+    INCLUDE (weight, mention_count);
+CREATE INDEX IX_covers_rev ON covers($to_id, $from_id)
+    INCLUDE (weight, mention_count);
+
+CREATE INDEX IX_mentions_fwd ON mentions($from_id, $to_id)
+    INCLUDE (relevance);
+CREATE INDEX IX_mentions_rev ON mentions($to_id, $from_id)
+    INCLUDE (relevance);
+
+CREATE INDEX IX_related_to_fwd ON related_to($from_id, $to_id)
+    INCLUDE (strength, relationship_type);
+CREATE INDEX IX_related_to_rev ON related_to($to_id, $from_id)
+    INCLUDE (strength, relationship_type);
+"""
+
+# Full-text catalog and index for keyword search over chunk text and
+# section headings. Tokenization happens once at write time
+# (CHANGE_TRACKING AUTO), so queries rank against the persisted index
+# instead of re-tokenizing rows; indexing section alongside text lets
+# keyword_search boost heading matches without query-time processing.
+# Full-text DDL cannot run inside a user transaction - init_db
+# executes these batches on a dedicated autocommit connection.
+FULLTEXT_SQL = """
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = 'secondbrain_catalog')
+BEGIN
+    CREATE FULLTEXT CATALOG secondbrain_catalog AS DEFAULT;
+END;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.fulltext_indexes
+    WHERE object_id = OBJECT_ID('dbo.chunks')
+)
+BEGIN
+    -- The PK constraint name is system-generated, so resolve the key
+    -- index dynamically
+    DECLARE @key sysname = (
+        SELECT i.name FROM sys.indexes i
+        WHERE i.object_id = OBJECT_ID('dbo.chunks') AND i.is_primary_key = 1
+    );
+    DECLARE @sql nvarchar(max) = N'
+        CREATE FULLTEXT INDEX ON dbo.chunks
+            ([text] LANGUAGE 1033, section LANGUAGE 1033)
+        KEY INDEX ' + QUOTENAME(@key) + N'
+        ON secondbrain_catalog WITH CHANGE_TRACKING AUTO;';
+    EXEC sp_executesql @sql;
+END;
+GO
+
+-- Databases indexed before section was added: extend in place
+IF EXISTS (
+    SELECT 1 FROM sys.fulltext_indexes
+    WHERE object_id = OBJECT_ID('dbo.chunks')
+) AND NOT EXISTS (
+    SELECT 1
+    FROM sys.fulltext_index_columns fic
+    JOIN sys.columns c
+        ON c.object_id = fic.object_id AND c.column_id = fic.column_id
+    WHERE fic.object_id = OBJECT_ID('dbo.chunks') AND c.name = 'section'
+)
+BEGIN
+    ALTER FULLTEXT INDEX ON dbo.chunks ADD (section LANGUAGE 1033);
+END;
 """
 
 # Drop all tables (for clean reset during development)
@@ -149,8 +376,14 @@ IF OBJECT_ID('dbo.related_to', 'U') IS NOT NULL DROP TABLE related_to;
 IF OBJECT_ID('dbo.mentions', 'U') IS NOT NULL DROP TABLE mentions;
 IF OBJECT_ID('dbo.covers', 'U') IS NOT NULL DROP TABLE covers;
 IF OBJECT_ID('dbo.from_source', 'U') IS NOT NULL DROP TABLE from_source;
+GO
 
 -- Drop nodes (chunks before sources due to FK)
+IF OBJECT_ID('dbo.sources_with_status', 'V') IS NOT NULL DROP VIEW sources_with_status;
+IF OBJECT_ID('dbo.status_labels', 'U') IS NOT NULL DROP TABLE status_labels;
+IF OBJECT_ID('dbo.query_cache', 'U') IS NOT NULL DROP TABLE query_cache;
+IF OBJECT_ID('dbo.llm_cache', 'U') IS NOT NULL DROP TABLE llm_cache;
+IF OBJECT_ID('dbo.embeddings_cache', 'U') IS NOT NULL DROP TABLE embeddings_cache;
 IF OBJECT_ID('dbo.concepts', 'U') IS NOT NULL DROP TABLE concepts;
 IF OBJECT_ID('dbo.chunks', 'U') IS NOT NULL DROP TABLE chunks;
 IF OBJECT_ID('dbo.sources', 'U') IS NOT NULL DROP TABLE sources;
@@ -165,73 +398,497 @@ WHERE TABLE_SCHEMA = 'dbo'
 """
 
 # Migration: Add chunk processing status columns (for existing databases)
-# Run this if database already has data and you don't want to reset
+# This migration is idempotent - safe to run multiple times
 MIGRATION_ADD_CHUNK_STATUS_SQL = """
--- Add processing status columns to chunks table
--- These columns enable resumable processing via timer function
-
--- Check if columns exist before adding (idempotent migration)
+-- Add embedding_status column if not exists
 IF NOT EXISTS (
     SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
     WHERE TABLE_NAME = 'chunks' AND COLUMN_NAME = 'embedding_status'
 )
 BEGIN
-    ALTER TABLE chunks ADD embedding_status NVARCHAR(20) NOT NULL DEFAULT 'PENDING';
-    ALTER TABLE chunks ADD CONSTRAINT CK_chunks_embedding_status
-        CHECK (embedding_status IN ('PENDING', 'COMPLETE', 'FAILED'));
+    ALTER TABLE chunks ADD embedding_status TINYINT NOT NULL DEFAULT 0;
 END;
+GO
 
+-- Add concept_status column if not exists
 IF NOT EXISTS (
     SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
     WHERE TABLE_NAME = 'chunks' AND COLUMN_NAME = 'concept_status'
 )
 BEGIN
-    ALTER TABLE chunks ADD concept_status NVARCHAR(20) NOT NULL DEFAULT 'PENDING';
-    ALTER TABLE chunks ADD CONSTRAINT CK_chunks_concept_status
-        CHECK (concept_status IN ('PENDING', 'EXTRACTED', 'FAILED'));
+    ALTER TABLE chunks ADD concept_status TINYINT NOT NULL DEFAULT 0;
+END;
+GO
+
+-- Add extraction_attempts column if not exists
+IF NOT EXISTS (
+    SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_NAME = 'chunks' AND COLUMN_NAME = 'extraction_attempts'
+)
+BEGIN
+    ALTER TABLE chunks ADD extraction_attempts TINYINT NOT NULL DEFAULT 0;
 END;
+GO
 
+-- Add extraction_error column if not exists
 IF NOT EXISTS (
     SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
     WHERE TABLE_NAME = 'chunks' AND COLUMN_NAME = 'extraction_error'
 )
 BEGIN
-    ALTER TABLE chunks ADD extraction_error NVARCHAR(500) NULL;
+    ALTER TABLE chunks ADD extraction_error NVARCHAR(500);
+END;
+GO
+
+-- Convert sources.status from NVARCHAR labels to TINYINT codes.
+-- Strings convert in place: rewrite the values to numeric strings,
+-- then ALTER COLUMN - no add/copy/rename dance, column order kept.
+-- Everything referencing the column (check, default, index) must be
+-- dropped first; the default constraint is system-named, so it is
+-- resolved from the catalog.
+IF EXISTS (
+    SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_NAME = 'sources' AND COLUMN_NAME = 'status'
+      AND DATA_TYPE = 'nvarchar'
+)
+BEGIN
+    DECLARE @df_status sysname = (
+        SELECT dc.name FROM sys.default_constraints dc
+        JOIN sys.columns c
+            ON c.object_id = dc.parent_object_id
+            AND c.column_id = dc.parent_column_id
+        WHERE dc.parent_object_id = OBJECT_ID('dbo.sources')
+          AND c.name = 'status'
+    );
+    IF @df_status IS NOT NULL
+        EXEC('ALTER TABLE sources DROP CONSTRAINT ' + @df_status);
+    IF OBJECT_ID('CK_sources_status', 'C') IS NOT NULL
+        ALTER TABLE sources DROP CONSTRAINT CK_sources_status;
+    IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_sources_status')
+        DROP INDEX IX_sources_status ON sources;
+
+    UPDATE sources SET status = CASE status
+        WHEN 'UPLOADED' THEN '0'
+        WHEN 'PARSING' THEN '1'
+        WHEN 'PARSED' THEN '2'
+        WHEN 'EXTRACTING' THEN '3'
+        WHEN 'COMPLETE' THEN '4'
+        WHEN 'PARSE_FAILED' THEN '5'
+        WHEN 'EXTRACT_FAILED' THEN '6'
+    END;
+    ALTER TABLE sources ALTER COLUMN status TINYINT NOT NULL;
+    ALTER TABLE sources ADD CONSTRAINT DF_sources_status DEFAULT 0 FOR status;
+    ALTER TABLE sources ADD CONSTRAINT CK_sources_status CHECK (status BETWEEN 0 AND 6);
+    CREATE INDEX IX_sources_status ON sources(status);
+END;
+GO
+
+-- Same in-place conversion for the chunk status columns. The filtered
+-- indexes over them are dropped here and recreated by the batches
+-- below with numeric predicates.
+IF EXISTS (
+    SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_NAME = 'chunks' AND COLUMN_NAME = 'embedding_status'
+      AND DATA_TYPE = 'nvarchar'
+)
+BEGIN
+    IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_chunks_pending_embedding')
+        DROP INDEX IX_chunks_pending_embedding ON chunks;
+    IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_chunks_pending_concept')
+        DROP INDEX IX_chunks_pending_concept ON chunks;
+    IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_chunks_embedded')
+        DROP INDEX IX_chunks_embedded ON chunks;
+    IF OBJECT_ID('CK_chunks_embedding_status', 'C') IS NOT NULL
+        ALTER TABLE chunks DROP CONSTRAINT CK_chunks_embedding_status;
+    IF OBJECT_ID('CK_chunks_concept_status', 'C') IS NOT NULL
+        ALTER TABLE chunks DROP CONSTRAINT CK_chunks_concept_status;
+    DECLARE @df_emb sysname = (
+        SELECT dc.name FROM sys.default_constraints dc
+        JOIN sys.columns c
+            ON c.object_id = dc.parent_object_id
+            AND c.column_id = dc.parent_column_id
+        WHERE dc.parent_object_id = OBJECT_ID('dbo.chunks')
+          AND c.name = 'embedding_status'
+    );
+    IF @df_emb IS NOT NULL
+        EXEC('ALTER TABLE chunks DROP CONSTRAINT ' + @df_emb);
+    DECLARE @df_con sysname = (
+        SELECT dc.name FROM sys.default_constraints dc
+        JOIN sys.columns c
+            ON c.object_id = dc.parent_object_id
+            AND c.column_id = dc.parent_column_id
+        WHERE dc.parent_object_id = OBJECT_ID('dbo.chunks')
+          AND c.name = 'concept_status'
+    );
+    IF @df_con IS NOT NULL
+        EXEC('ALTER TABLE chunks DROP CONSTRAINT ' + @df_con);
+
+    UPDATE chunks SET
+        embedding_status = CASE embedding_status
+            WHEN 'PENDING' THEN '0'
+            WHEN 'COMPLETE' THEN '1'
+            WHEN 'FAILED' THEN '2'
+        END,
+        concept_status = CASE concept_status
+            WHEN 'PENDING' THEN '0'
+            WHEN 'EXTRACTED' THEN '1'
+            WHEN 'FAILED' THEN '2'
+        END;
+    ALTER TABLE chunks ALTER COLUMN embedding_status TINYINT NOT NULL;
+    ALTER TABLE chunks ALTER COLUMN concept_status TINYINT NOT NULL;
+    ALTER TABLE chunks ADD CONSTRAINT DF_chunks_embedding_status DEFAULT 0 FOR embedding_status;
+    ALTER TABLE chunks ADD CONSTRAINT DF_chunks_concept_status DEFAULT 0 FOR concept_status;
+    ALTER TABLE chunks ADD CONSTRAINT CK_chunks_embedding_status CHECK (embedding_status BETWEEN 0 AND 3);
+    ALTER TABLE chunks ADD CONSTRAINT CK_chunks_concept_status CHECK (concept_status BETWEEN 0 AND 3);
+END;
+GO
+
+-- Label lookup table for the numeric codes (if not exists)
+IF OBJECT_ID('dbo.status_labels', 'U') IS NULL
+BEGIN
+    CREATE TABLE status_labels (
+        domain NVARCHAR(20) NOT NULL,
+        code TINYINT NOT NULL,
+        label NVARCHAR(20) NOT NULL,
+        PRIMARY KEY (domain, code)
+    );
+    INSERT INTO status_labels (domain, code, label) VALUES
+        ('source', 0, 'UPLOADED'),
+        ('source', 1, 'PARSING'),
+        ('source', 2, 'PARSED'),
+        ('source', 3, 'EXTRACTING'),
+        ('source', 4, 'COMPLETE'),
+        ('source', 5, 'PARSE_FAILED'),
+        ('source', 6, 'EXTRACT_FAILED'),
+        ('embedding', 0, 'PENDING'),
+        ('embedding', 1, 'COMPLETE'),
+        ('embedding', 2, 'FAILED'),
+        ('embedding', 3, 'PROCESSING'),
+        ('concept', 0, 'PENDING'),
+        ('concept', 1, 'EXTRACTED'),
+        ('concept', 2, 'FAILED'),
+        ('concept', 3, 'PROCESSING');
+END;
+GO
+
+-- Readable source listing (dynamic SQL: CREATE VIEW must be alone in
+-- its batch, which an IF guard would break)
+IF OBJECT_ID('dbo.sources_with_status', 'V') IS NULL
+    EXEC('CREATE VIEW sources_with_status AS
+        SELECT s.id, s.title, s.author, s.source_type, s.file_path,
+               s.page_count, s.status, l.label AS status_label,
+               s.error_message, s.created_at, s.updated_at
+        FROM sources s
+        JOIN status_labels l ON l.domain = ''source'' AND l.code = s.status;');
+GO
+
+-- Create filtered covering index for finding pending embeddings (if not exists)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_chunks_pending_embedding')
+BEGIN
+    CREATE INDEX IX_chunks_pending_embedding ON chunks(source_id, position)
+        INCLUDE (text)
+        WHERE embedding_status = 0;
+END;
+GO
+
+-- Recreate the concept-poll index if it predates the full eligibility
+-- filter (embedding ready, retries not exhausted)
+IF EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE name = 'IX_chunks_pending_concept'
+      AND filter_definition NOT LIKE '%extraction_attempts%'
+)
+BEGIN
+    DROP INDEX IX_chunks_pending_concept ON chunks;
 END;
+GO
 
+-- Create filtered covering index for finding pending concept extraction (if not exists)
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_chunks_pending_concept')
+BEGIN
+    CREATE INDEX IX_chunks_pending_concept ON chunks(source_id, position)
+        INCLUDE (text)
+        WHERE concept_status = 0
+          AND embedding_status = 1
+          AND extraction_attempts < 3;
+END;
+GO
+
+-- Recreate the search-index load filter dropped by the conversion
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_chunks_embedded')
+BEGIN
+    CREATE INDEX IX_chunks_embedded ON chunks(source_id, position)
+        WHERE embedding_status = 1;
+END;
+GO
+
+-- Drop the superseded single-column status indexes if present
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_chunks_embedding_status')
+BEGIN
+    DROP INDEX IX_chunks_embedding_status ON chunks;
+END;
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_chunks_concept_status')
+BEGIN
+    DROP INDEX IX_chunks_concept_status ON chunks;
+END;
+GO
+
+-- Add binary embedding column if not exists (new writes land here;
+-- the JSON embedding column stays for rows written before it)
 IF NOT EXISTS (
     SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
-    WHERE TABLE_NAME = 'chunks' AND COLUMN_NAME = 'extraction_attempts'
+    WHERE TABLE_NAME = 'chunks' AND COLUMN_NAME = 'embedding_bin'
 )
 BEGIN
-    ALTER TABLE chunks ADD extraction_attempts INT NOT NULL DEFAULT 0;
+    ALTER TABLE chunks ADD embedding_bin VARBINARY(6144);
 END;
+GO
 
--- Add filtered indexes for efficient pending chunk queries
+-- Same binary embedding column for concepts (written by the
+-- similarity pass; the JSON column stays as the legacy fallback)
 IF NOT EXISTS (
-    SELECT 1 FROM sys.indexes WHERE name = 'IX_chunks_embedding_status'
+    SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_NAME = 'concepts' AND COLUMN_NAME = 'embedding_bin'
+)
+BEGIN
+    ALTER TABLE concepts ADD embedding_bin VARBINARY(6144);
+END;
+GO
+
+-- Adjacency indexes for the graph edge tables (if not exists) - see
+-- the pattern note in SCHEMA_SQL
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_covers_fwd')
+    CREATE INDEX IX_covers_fwd ON covers($from_id, $to_id)
+        INCLUDE (weight, mention_count);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_covers_rev')
+    CREATE INDEX IX_covers_rev ON covers($to_id, $from_id)
+        INCLUDE (weight, mention_count);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_mentions_fwd')
+    CREATE INDEX IX_mentions_fwd ON mentions($from_id, $to_id)
+        INCLUDE (relevance);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_mentions_rev')
+    CREATE INDEX IX_mentions_rev ON mentions($to_id, $from_id)
+        INCLUDE (relevance);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_related_to_fwd')
+    CREATE INDEX IX_related_to_fwd ON related_to($from_id, $to_id)
+        INCLUDE (strength, relationship_type);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_related_to_rev')
+    CREATE INDEX IX_related_to_rev ON related_to($to_id, $from_id)
+        INCLUDE (strength, relationship_type);
+GO
+
+-- Case-fold the concept name key. The original UQ_concepts_name_ci
+-- indexed the raw name column, so 'Graphs' and 'graphs' could both
+-- insert despite the documented case-insensitive invariant. Drop it
+-- if it is still keyed on name; it is rebuilt below over name_ci.
+IF EXISTS (
+    SELECT 1
+    FROM sys.indexes i
+    JOIN sys.index_columns ic
+        ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+    JOIN sys.columns c
+        ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+    WHERE i.name = 'UQ_concepts_name_ci' AND c.name = 'name'
 )
 BEGIN
-    CREATE INDEX IX_chunks_embedding_status ON chunks(embedding_status)
-        WHERE embedding_status = 'PENDING';
+    DROP INDEX UQ_concepts_name_ci ON concepts;
 END;
+GO
 
+-- Persisted lowercase key column (if not exists)
 IF NOT EXISTS (
-    SELECT 1 FROM sys.indexes WHERE name = 'IX_chunks_concept_status'
+    SELECT 1 FROM sys.columns
+    WHERE object_id = OBJECT_ID('dbo.concepts') AND name = 'name_ci'
 )
 BEGIN
-    CREATE INDEX IX_chunks_concept_status ON chunks(concept_status)
-        WHERE concept_status = 'PENDING';
+    ALTER TABLE concepts ADD name_ci AS LOWER(name) PERSISTED;
 END;
+GO
 
--- Mark existing chunks with embeddings as COMPLETE
-UPDATE chunks SET embedding_status = 'COMPLETE' WHERE embedding IS NOT NULL;
+-- Rebuild the unique index over name_ci. Mixed-case duplicates that
+-- slipped past the old index are collapsed onto the oldest row first;
+-- SQL Graph edge endpoints are immutable, so the duplicates' edges
+-- are removed with them rather than re-pointed.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'UQ_concepts_name_ci')
+BEGIN
+    SELECT c.$node_id AS node_id, c.id
+    INTO #dupes
+    FROM concepts c
+    JOIN (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY LOWER(name) ORDER BY id
+        ) AS rn
+        FROM concepts
+    ) d ON d.id = c.id
+    WHERE d.rn > 1;
+
+    DELETE FROM mentions WHERE $to_id IN (SELECT node_id FROM #dupes);
+    DELETE FROM covers WHERE $to_id IN (SELECT node_id FROM #dupes);
+    DELETE FROM related_to
+    WHERE $from_id IN (SELECT node_id FROM #dupes)
+       OR $to_id IN (SELECT node_id FROM #dupes);
+    DELETE FROM concepts WHERE id IN (SELECT id FROM #dupes);
+    DROP TABLE #dupes;
+
+    CREATE UNIQUE INDEX UQ_concepts_name_ci
+    ON concepts (name_ci)
+    WHERE name_ci IS NOT NULL;
+END;
+GO
 
--- Mark existing chunks that have concepts extracted as EXTRACTED
--- (chunks that have mentions edges)
-UPDATE c SET c.concept_status = 'EXTRACTED'
-FROM chunks c
-WHERE EXISTS (
-    SELECT 1 FROM mentions m WHERE m.$from_id = c.$node_id
-);
+-- Claim support: claimed_at timestamp, PROCESSING code in the status
+-- range, and its label rows
+IF NOT EXISTS (
+    SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_NAME = 'chunks' AND COLUMN_NAME = 'claimed_at'
+)
+BEGIN
+    ALTER TABLE chunks ADD claimed_at DATETIME2;
+END;
+GO
+
+-- Widen the status checks to admit PROCESSING (drop-and-readd is
+-- idempotent; the definitions below are the current ones)
+IF OBJECT_ID('CK_chunks_embedding_status', 'C') IS NOT NULL
+    ALTER TABLE chunks DROP CONSTRAINT CK_chunks_embedding_status;
+ALTER TABLE chunks ADD CONSTRAINT CK_chunks_embedding_status CHECK (embedding_status BETWEEN 0 AND 3);
+IF OBJECT_ID('CK_chunks_concept_status', 'C') IS NOT NULL
+    ALTER TABLE chunks DROP CONSTRAINT CK_chunks_concept_status;
+ALTER TABLE chunks ADD CONSTRAINT CK_chunks_concept_status CHECK (concept_status BETWEEN 0 AND 3);
+GO
+
+IF OBJECT_ID('dbo.status_labels', 'U') IS NOT NULL
+   AND NOT EXISTS (
+    SELECT 1 FROM status_labels WHERE domain = 'embedding' AND code = 3
+)
+BEGIN
+    INSERT INTO status_labels (domain, code, label) VALUES
+        ('embedding', 3, 'PROCESSING'),
+        ('concept', 3, 'PROCESSING');
+END;
+GO
+
+-- Page-compress chunks and concepts if their clustered index is not
+-- compressed yet (see the rationale in SCHEMA_SQL). REBUILD is
+-- offline on Basic tier - run during a quiet window for large tables.
+IF EXISTS (
+    SELECT 1 FROM sys.partitions
+    WHERE object_id = OBJECT_ID('dbo.chunks')
+      AND index_id IN (0, 1) AND data_compression = 0
+)
+BEGIN
+    ALTER TABLE chunks REBUILD WITH (DATA_COMPRESSION = PAGE);
+END;
+GO
+
+IF EXISTS (
+    SELECT 1 FROM sys.partitions
+    WHERE object_id = OBJECT_ID('dbo.concepts')
+      AND index_id IN (0, 1) AND data_compression = 0
+)
+BEGIN
+    ALTER TABLE concepts REBUILD WITH (DATA_COMPRESSION = PAGE);
+END;
+GO
+
+-- Drop the redundant chunk-to-source edge table: chunks.source_id
+-- with its FK is the same adjacency without the duplicated writes
+IF OBJECT_ID('dbo.from_source', 'U') IS NOT NULL
+BEGIN
+    DROP TABLE from_source;
+END;
+GO
+
+-- Narrow fixed-width chunk columns to their actual bounds:
+-- position/pages to SMALLINT (capped at 3000 chunks and 2500 pages
+-- by the cost controls), extraction_attempts to TINYINT (max 3).
+-- The position-keyed constraint and indexes must come off first and
+-- the attempts default dropped (both block ALTER COLUMN), then
+-- everything is re-created and the table rebuilt so the narrower
+-- rows take effect on disk.
+IF EXISTS (
+    SELECT 1 FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE TABLE_NAME = 'chunks' AND COLUMN_NAME = 'position'
+      AND DATA_TYPE = 'int'
+)
+BEGIN
+    DECLARE @df_attempts sysname;
+    SELECT @df_attempts = dc.name
+    FROM sys.default_constraints dc
+    JOIN sys.columns c ON c.object_id = dc.parent_object_id
+        AND c.column_id = dc.parent_column_id
+    WHERE dc.parent_object_id = OBJECT_ID('dbo.chunks')
+      AND c.name = 'extraction_attempts';
+    IF @df_attempts IS NOT NULL
+        EXEC('ALTER TABLE chunks DROP CONSTRAINT ' + @df_attempts);
+
+    ALTER TABLE chunks DROP CONSTRAINT UQ_chunks_position;
+    IF EXISTS (SELECT 1 FROM sys.indexes
+               WHERE object_id = OBJECT_ID('dbo.chunks')
+                 AND name = 'IX_chunks_pending_embedding')
+        DROP INDEX IX_chunks_pending_embedding ON chunks;
+    IF EXISTS (SELECT 1 FROM sys.indexes
+               WHERE object_id = OBJECT_ID('dbo.chunks')
+                 AND name = 'IX_chunks_pending_concept')
+        DROP INDEX IX_chunks_pending_concept ON chunks;
+    IF EXISTS (SELECT 1 FROM sys.indexes
+               WHERE object_id = OBJECT_ID('dbo.chunks')
+                 AND name = 'IX_chunks_embedded')
+        DROP INDEX IX_chunks_embedded ON chunks;
+
+    ALTER TABLE chunks ALTER COLUMN position SMALLINT NOT NULL;
+    ALTER TABLE chunks ALTER COLUMN page_start SMALLINT;
+    ALTER TABLE chunks ALTER COLUMN page_end SMALLINT;
+    ALTER TABLE chunks ALTER COLUMN extraction_attempts TINYINT NOT NULL;
+
+    ALTER TABLE chunks ADD CONSTRAINT DF_chunks_extraction_attempts
+        DEFAULT 0 FOR extraction_attempts;
+    ALTER TABLE chunks ADD CONSTRAINT UQ_chunks_position
+        UNIQUE (source_id, position);
+
+    -- Metadata-only ALTERs leave old row images in place; rebuild so
+    -- the narrower rows take effect on disk (keeps page compression)
+    ALTER TABLE chunks REBUILD WITH (DATA_COMPRESSION = PAGE);
+END;
+GO
+
+-- Re-create the poll indexes dropped by the narrowing batch above
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE object_id = OBJECT_ID('dbo.chunks')
+      AND name = 'IX_chunks_pending_embedding'
+)
+BEGIN
+    CREATE INDEX IX_chunks_pending_embedding ON chunks(source_id, position)
+        INCLUDE (text)
+        WHERE embedding_status = 0;
+END;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE object_id = OBJECT_ID('dbo.chunks')
+      AND name = 'IX_chunks_pending_concept'
+)
+BEGIN
+    CREATE INDEX IX_chunks_pending_concept ON chunks(source_id, position)
+        INCLUDE (text)
+        WHERE concept_status = 0
+          AND embedding_status = 1
+          AND extraction_attempts < 3;
+END;
+GO
+
+IF NOT EXISTS (
+    SELECT 1 FROM sys.indexes
+    WHERE object_id = OBJECT_ID('dbo.chunks')
+      AND name = 'IX_chunks_embedded'
+)
+BEGIN
+    CREATE INDEX IX_chunks_embedded ON chunks(source_id, position)
+        WHERE embedding_status = 1;
+END;
+GO
 """
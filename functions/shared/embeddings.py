@@ -14,6 +14,7 @@ Configuration:
 """
 
 import json
+import math
 import os
 import time
 from typing import TYPE_CHECKING
@@ -101,6 +102,20 @@ def _get_client() -> AzureOpenAI | OpenAI:
     )
 
 
+def _normalize(embedding: list[float]) -> list[float]:
+    """Scale an embedding to exact unit length.
+
+    OpenAI embeddings come back approximately unit-norm but not exactly.
+    Normalizing once at write time means a plain inner product equals
+    cosine similarity downstream - search never has to re-normalize
+    stored vectors.
+    """
+    norm = math.sqrt(sum(x * x for x in embedding))
+    if norm == 0.0:
+        return embedding
+    return [x / norm for x in embedding]
+
+
 def _get_model_name() -> str:
     """Get the model/deployment name for API calls."""
     global _deployment_name
@@ -117,7 +132,7 @@ def get_embedding(text: str, max_retries: int = 3) -> list[float]:
         max_retries: Number of retry attempts for rate limits
 
     Returns:
-        List of floats (1536 dimensions)
+        List of floats (1536 dimensions, unit length)
 
     Raises:
         RateLimitError: If rate limit exceeded after all retries
@@ -132,7 +147,7 @@ def get_embedding(text: str, max_retries: int = 3) -> list[float]:
                 input=text,
                 model=model,
             )
-            return response.data[0].embedding
+            return _normalize(response.data[0].embedding)
 
         except RateLimitError:
             if attempt < max_retries - 1:
@@ -175,7 +190,7 @@ def get_embeddings_batch(
         max_retries: Number of retry attempts for rate limits
 
     Returns:
-        List of embeddings in same order as input texts
+        List of unit-length embeddings in same order as input texts
     """
     client = _get_client()
     model = _get_model_name()
@@ -190,7 +205,7 @@ def get_embeddings_batch(
                     input=batch,
                     model=model,
                 )
-                batch_embeddings = [item.embedding for item in response.data]
+                batch_embeddings = [_normalize(item.embedding) for item in response.data]
                 all_embeddings.extend(batch_embeddings)
 
                 structured_logger.info(
@@ -9,6 +9,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import TYPE_CHECKING
 
 from .db.connection import get_db_cursor
+from .db.models import CONCEPT_STATUS_CODES, SOURCE_STATUS_CODES
 
 from .concepts import ExtractionResult, Relationship, find_source_relationships
 from .logging_utils import structured_logger
@@ -51,7 +52,7 @@ def store_chunk_extraction(
             """
             MERGE INTO concepts AS target
             USING (SELECT ? AS name, ? AS category, ? AS description) AS source
-            ON LOWER(target.name) = LOWER(source.name)
+            ON target.name_ci = LOWER(source.name)
             WHEN MATCHED THEN
                 UPDATE SET
                     description = COALESCE(source.description, target.description),
@@ -66,8 +67,11 @@ def store_chunk_extraction(
         concepts_created += 1
 
     # === CREATE mentions EDGES (chunk → concept) ===
-    for concept in extraction["concepts"]:
-        # Get first 200 chars of chunk as context
+    # One set-based INSERT for the whole chunk: the context snippet is
+    # fetched once and the concept names go in as an IN list, instead
+    # of a SELECT + INSERT round-trip pair per concept
+    names = [concept["name"] for concept in extraction["concepts"]]
+    if names:
         cursor.execute(
             "SELECT LEFT(text, 200) FROM chunks WHERE id = ?",
             (chunk_id,),
@@ -75,18 +79,19 @@ def store_chunk_extraction(
         row = cursor.fetchone()
         context = row[0] if row else ""
 
+        placeholders = ", ".join("LOWER(?)" for _ in names)
         cursor.execute(
-            """
+            f"""
             INSERT INTO mentions ($from_id, $to_id, relevance, context)
             SELECT c.$node_id, con.$node_id, 0.8, ?
             FROM chunks c, concepts con
-            WHERE c.id = ? AND LOWER(con.name) = LOWER(?)
+            WHERE c.id = ? AND con.name_ci IN ({placeholders})
               AND NOT EXISTS (
                   SELECT 1 FROM mentions m
                   WHERE m.$from_id = c.$node_id AND m.$to_id = con.$node_id
               )
             """,
-            (context, chunk_id, concept["name"]),
+            (context, chunk_id, *names),
         )
         edges_created += cursor.rowcount
 
@@ -97,8 +102,8 @@ def store_chunk_extraction(
             INSERT INTO related_to ($from_id, $to_id, relationship_type, strength, source_id)
             SELECT c1.$node_id, c2.$node_id, ?, 0.8, ?
             FROM concepts c1, concepts c2
-            WHERE LOWER(c1.name) = LOWER(?)
-              AND LOWER(c2.name) = LOWER(?)
+            WHERE c1.name_ci = LOWER(?)
+              AND c2.name_ci = LOWER(?)
               AND NOT EXISTS (
                   SELECT 1 FROM related_to r
                   WHERE r.$from_id = c1.$node_id
@@ -130,6 +135,11 @@ def store_chunk_extraction_standalone(
     its own database cursor. Used by the timer function for
     individual chunk processing.
 
+    The chunk's concept_status flip to EXTRACTED rides in the same
+    transaction: one commit for the whole per-chunk write sequence
+    instead of a separate status call afterwards, and a chunk can
+    never commit as EXTRACTED without its edges (or vice versa).
+
     Args:
         source_id: ID of the source document
         chunk: Chunk object with id and text
@@ -138,8 +148,17 @@ def store_chunk_extraction_standalone(
     Returns:
         Tuple of (concepts_created, edges_created)
     """
-    with get_db_cursor(commit=True) as cursor:
-        return store_chunk_extraction(cursor, chunk.id, source_id, extraction)
+    # durable=False: a commit lost to a crash leaves the chunk in
+    # PROCESSING, and the stale-claim requeue replays it - no need to
+    # wait for the log flush on every chunk
+    with get_db_cursor(commit=True, durable=False) as cursor:
+        result = store_chunk_extraction(cursor, chunk.id, source_id, extraction)
+        cursor.execute(
+            f"UPDATE chunks SET concept_status = "
+            f"{CONCEPT_STATUS_CODES['EXTRACTED']} WHERE id = ?",
+            (chunk.id,),
+        )
+        return result
 
 
 def source_level_relationship_pass(cursor, source_id: int) -> int:
@@ -200,8 +219,8 @@ def source_level_relationship_pass(cursor, source_id: int) -> int:
             INSERT INTO related_to ($from_id, $to_id, relationship_type, strength, source_id)
             SELECT c1.$node_id, c2.$node_id, ?, 0.7, ?
             FROM concepts c1, concepts c2
-            WHERE LOWER(c1.name) = LOWER(?)
-              AND LOWER(c2.name) = LOWER(?)
+            WHERE c1.name_ci = LOWER(?)
+              AND c2.name_ci = LOWER(?)
               AND NOT EXISTS (
                   SELECT 1 FROM related_to r
                   WHERE r.$from_id = c1.$node_id AND r.$to_id = c2.$node_id
@@ -374,7 +393,8 @@ def process_source_concepts(
     with get_db_cursor(commit=True) as cursor:
         # Update status to EXTRACTING
         cursor.execute(
-            "UPDATE sources SET status = 'EXTRACTING', updated_at = GETDATE() WHERE id = ?",
+            f"UPDATE sources SET status = {SOURCE_STATUS_CODES['EXTRACTING']}, "
+            "updated_at = GETDATE() WHERE id = ?",
             (source_id,),
         )
 
@@ -417,7 +437,8 @@ def process_source_concepts(
 
         # Update status to COMPLETE
         cursor.execute(
-            "UPDATE sources SET status = 'COMPLETE', updated_at = GETDATE() WHERE id = ?",
+            f"UPDATE sources SET status = {SOURCE_STATUS_CODES['COMPLETE']}, "
+            "updated_at = GETDATE() WHERE id = ?",
             (source_id,),
         )
 
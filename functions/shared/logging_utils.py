@@ -12,7 +12,11 @@ from typing import Any
 
 
 class StructuredLogger:
-    """Logger that outputs structured JSON for observability."""
+    """Logger that outputs structured JSON for observability.
+
+    Payloads are only built and serialized when the target level is
+    enabled, so filtered calls cost a single level check on hot paths.
+    """
 
     def __init__(self, logger: logging.Logger | None = None):
         """Initialize structured logger.
@@ -84,6 +88,8 @@ class StructuredLogger:
             duration_ms: Operation duration in milliseconds
             **kwargs: Additional fields
         """
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         self.logger.info(self._format_log("INFO", step, message, duration_ms, **kwargs))
 
     def warning(
@@ -101,6 +107,8 @@ class StructuredLogger:
             duration_ms: Operation duration in milliseconds
             **kwargs: Additional fields
         """
+        if not self.logger.isEnabledFor(logging.WARNING):
+            return
         self.logger.warning(
             self._format_log("WARNING", step, message, duration_ms, **kwargs)
         )
@@ -120,6 +128,8 @@ class StructuredLogger:
             duration_ms: Operation duration in milliseconds
             **kwargs: Additional fields
         """
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
         self.logger.error(
             self._format_log("ERROR", step, message, duration_ms, **kwargs)
         )
@@ -1,18 +1,64 @@
 """Database storage for parsed documents.
 
 Handles idempotent storage of sources and chunks to Azure SQL Graph.
-Implements delete-and-replace pattern for reprocessing.
+Sources are upserted in place (MERGE); chunks use delete-and-replace.
 Supports optional embeddings storage.
 """
 
 import json
+import struct
 
 from .db.connection import get_db_cursor
+from .db.models import (
+    CONCEPT_STATUS_CODES,
+    CONCEPT_STATUS_LABELS,
+    EMBEDDING_STATUS_CODES,
+    EMBEDDING_STATUS_LABELS,
+    SOURCE_STATUS_CODES,
+    SOURCE_STATUS_LABELS,
+)
+from .db.statements import (
+    APPLY_EMBEDDING_STAGE,
+    CHECK_SOURCE_COMPLETE,
+    CLAIM_PENDING_CONCEPT_CHUNKS,
+    CLAIM_PENDING_EMBEDDING_CHUNKS,
+    CREATE_EMBEDDING_STAGE,
+    GET_PENDING_CONCEPT_CHUNKS,
+    GET_PENDING_EMBEDDING_CHUNKS,
+    INSERT_EMBEDDING_STAGE,
+    MARK_CONCEPT_STATUS,
+    MARK_CONCEPT_STATUS_WITH_ERROR,
+    MARK_EMBEDDING_FAILED,
+    PROCESSING_STATS,
+    REQUEUE_STALE_CONCEPT_CLAIMS,
+    REQUEUE_STALE_EMBEDDING_CLAIMS,
+    UPDATE_CHUNK_EMBEDDING,
+)
 
 from .chunker import Chunk
 from .logging_utils import structured_logger
 from .parser import ParsedDocument
 
+# Status codes inlined into the document-level SQL below; the
+# chunk-level hot statements live in db/statements.py. They are module
+# constants, so each statement's text is still fixed at import time
+# and the server's plan cache keys stay stable. The public API keeps
+# the string labels ('COMPLETE', 'EXTRACTED', ...).
+_PARSED = SOURCE_STATUS_CODES["PARSED"]
+_EMB_PENDING = EMBEDDING_STATUS_CODES["PENDING"]
+_EMB_COMPLETE = EMBEDDING_STATUS_CODES["COMPLETE"]
+_CON_PENDING = CONCEPT_STATUS_CODES["PENDING"]
+
+
+def _pack_embedding(embedding: list[float]) -> bytes:
+    """Pack an embedding as little-endian float32 for VARBINARY storage.
+
+    6 KB per vector versus ~24 KB as UTF-16 JSON text - a 4x cut in
+    row I/O - and readers rebuild the array straight from the bytes
+    with no JSON parse.
+    """
+    return struct.pack(f"<{len(embedding)}f", *embedding)
+
 
 def store_document(
     doc: ParsedDocument,
@@ -21,9 +67,10 @@ def store_document(
 ) -> int:
     """Store parsed document and chunks in database.
 
-    Implements idempotency via delete-and-replace pattern:
-    - If source with same file_path exists, delete it (cascades to chunks)
-    - Insert new source and all chunks in single transaction
+    Implements idempotency via upsert-and-replace:
+    - Source row is upserted by file_path in a single MERGE round-trip
+    - Existing chunks (and their edges) are deleted and re-inserted
+    - All operations run in a single transaction
 
     Args:
         doc: Parsed document with metadata
@@ -37,35 +84,37 @@ def store_document(
         Exception: If database operation fails (transaction rolled back)
     """
     with get_db_cursor(commit=True) as cursor:
-        # === IDEMPOTENCY: Delete existing source if present ===
-        # CASCADE delete removes chunks automatically
-        cursor.execute(
-            "DELETE FROM sources WHERE file_path = ?",
-            (file_path,)
-        )
-        deleted = cursor.rowcount
-        if deleted > 0:
-            structured_logger.info(
-                "store",
-                "Deleted existing source for reprocessing",
-                file_path=file_path,
-            )
-
-        # === INSERT SOURCE ===
-        # Determine source type from filename
+        # === UPSERT SOURCE (idempotency) ===
+        # Single MERGE round-trip: update the existing row in place on
+        # re-processing instead of delete-and-reinsert. HOLDLOCK prevents
+        # two concurrent ingestions of the same file_path from both
+        # taking the NOT MATCHED branch.
         source_type = "pdf" if file_path.lower().endswith(".pdf") else "unknown"
-
-        # Serialize metadata to JSON
         metadata_json = json.dumps(doc.metadata) if doc.metadata else None
 
         cursor.execute(
-            """
-            INSERT INTO sources (
-                title, author, source_type, file_path,
-                page_count, status, metadata
+            f"""
+            MERGE sources WITH (HOLDLOCK) AS t
+            USING (VALUES (?, ?, ?, ?, ?, ?))
+                AS s(title, author, source_type, file_path, page_count, metadata)
+                ON t.file_path = s.file_path
+            WHEN MATCHED THEN UPDATE SET
+                title = s.title,
+                author = s.author,
+                source_type = s.source_type,
+                page_count = s.page_count,
+                status = {_PARSED},
+                error_message = NULL,
+                metadata = s.metadata,
+                updated_at = GETDATE()
+            WHEN NOT MATCHED THEN INSERT (
+                title, author, source_type, file_path, page_count, status, metadata
+            )
+            VALUES (
+                s.title, s.author, s.source_type, s.file_path,
+                s.page_count, {_PARSED}, s.metadata
             )
-            OUTPUT INSERTED.id
-            VALUES (?, ?, ?, ?, ?, 'PARSED', ?)
+            OUTPUT INSERTED.id;
             """,
             (
                 doc.title,
@@ -78,61 +127,92 @@ def store_document(
         )
         source_id = cursor.fetchone()[0]
 
+        # Old chunks (and their graph edges) are still replaced explicitly,
+        # but the sources row itself survives re-processing unchanged.
+        # SQL Graph does not cascade node deletes into edges, so the
+        # chunks' mentions edges go first.
+        cursor.execute(
+            """
+            DELETE FROM mentions
+            WHERE $from_id IN (SELECT $node_id FROM chunks WHERE source_id = ?)
+            """,
+            (source_id,)
+        )
+        cursor.execute(
+            "DELETE FROM chunks WHERE source_id = ?",
+            (source_id,)
+        )
+        if cursor.rowcount > 0:
+            structured_logger.info(
+                "store",
+                "Deleted existing chunks for reprocessing",
+                source_id=source_id,
+                file_path=file_path,
+            )
+
         structured_logger.info(
             "store",
-            "Source record created",
+            "Source record upserted",
             source_id=source_id,
             title=doc.title,
         )
 
-        # === INSERT CHUNKS ===
-        chunk_count = 0
+        # === INSERT CHUNKS (bulk) ===
+        # embedding_status: COMPLETE if embedding provided, else PENDING
+        # concept_status: always PENDING (timer function handles extraction)
+        rows = []
         for chunk in chunks:
-            # Build chunk metadata
-            chunk_metadata = {
+            chunk_metadata_json = json.dumps({
                 "page_start": chunk.page_start,
                 "page_end": chunk.page_end,
-            }
-            chunk_metadata_json = json.dumps(chunk_metadata)
+            })
 
-            # Serialize embedding if present
-            embedding_json = None
-            embedding_status = "PENDING"
+            # Serialize embedding if present (binary FP32 layout)
+            embedding_bin = None
+            embedding_status = _EMB_PENDING
             if chunk.embedding is not None:
-                embedding_json = json.dumps(chunk.embedding)
-                embedding_status = "COMPLETE"
-
-            # Store chunk with processing status
-            # embedding_status: COMPLETE if embedding provided, else PENDING
-            # concept_status: always PENDING (timer function handles extraction)
-            cursor.execute(
-                """
+                embedding_bin = _pack_embedding(chunk.embedding)
+                embedding_status = _EMB_COMPLETE
+
+            rows.append((
+                source_id,
+                chunk.text,
+                chunk.position,
+                chunk.page_start,
+                chunk.page_end,
+                chunk.section,
+                len(chunk.text),
+                embedding_bin,
+                embedding_status,
+                chunk_metadata_json,
+            ))
+
+        if rows:
+            # One array-bound executemany ships all chunks as bulk TDS
+            # batches (fast_executemany is set by get_db_cursor) instead
+            # of an INSERT round-trip per chunk. OUTPUT INSERTED.id does
+            # not compose with executemany, so generated ids map back
+            # through one SELECT keyed on position.
+            cursor.executemany(
+                f"""
                 INSERT INTO chunks (
                     source_id, text, position, page_start, page_end,
-                    section, char_count, embedding, embedding_status,
+                    section, char_count, embedding_bin, embedding_status,
                     concept_status, metadata
                 )
-                OUTPUT INSERTED.id
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'PENDING', ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, {_CON_PENDING}, ?)
                 """,
-                (
-                    source_id,
-                    chunk.text,
-                    chunk.position,
-                    chunk.page_start,
-                    chunk.page_end,
-                    chunk.section,
-                    len(chunk.text),
-                    embedding_json,
-                    embedding_status,
-                    chunk_metadata_json,
-                ),
+                rows,
+            )
+            cursor.execute(
+                "SELECT position, id FROM chunks WHERE source_id = ?",
+                (source_id,),
             )
-            # Store the chunk ID for later use in concept extraction
-            row = cursor.fetchone()
-            if row:
-                chunk.id = row[0]
-            chunk_count += 1
+            id_by_position = dict(cursor.fetchall())
+            # Store the chunk IDs for later use in concept extraction
+            for chunk in chunks:
+                chunk.id = id_by_position.get(chunk.position)
+        chunk_count = len(rows)
 
         structured_logger.info(
             "store",
@@ -141,26 +221,8 @@ def store_document(
             chunk_count=chunk_count,
         )
 
-        # === CREATE from_source EDGES ===
-        # Connect each chunk to its source for graph queries
-        cursor.execute(
-            """
-            INSERT INTO from_source ($from_id, $to_id)
-            SELECT c.$node_id, s.$node_id
-            FROM chunks c, sources s
-            WHERE c.source_id = ? AND s.id = ?
-            """,
-            (source_id, source_id)
-        )
-        edge_count = cursor.rowcount
-
-        structured_logger.info(
-            "store",
-            "Graph edges created",
-            source_id=source_id,
-            edge_count=edge_count,
-        )
-
+        # No chunk-to-source edges: chunks.source_id is that adjacency
+        # (see the schema note in db/models.py)
         return source_id
 
 
@@ -173,7 +235,7 @@ def update_source_status(
 
     Args:
         source_id: ID of source to update
-        status: New status value
+        status: New status label (e.g. 'COMPLETE', 'PARSE_FAILED')
         error_message: Optional error message for failed states
     """
     with get_db_cursor(commit=True) as cursor:
@@ -183,7 +245,7 @@ def update_source_status(
             SET status = ?, error_message = ?, updated_at = GETDATE()
             WHERE id = ?
             """,
-            (status, error_message, source_id)
+            (SOURCE_STATUS_CODES[status], error_message, source_id)
         )
 
         structured_logger.info(
@@ -222,13 +284,18 @@ def get_source_by_path(file_path: str) -> dict | None:
                 "source_type": row[3],
                 "file_path": row[4],
                 "page_count": row[5],
-                "status": row[6],
+                "status": SOURCE_STATUS_LABELS.get(row[6], row[6]),
                 "error_message": row[7],
                 "created_at": row[8],
             }
         return None
 
 
+# Column order for get_chunks_for_source (shared by the SELECT and the
+# dict construction; zip against a constant tuple skips per-row key hashing)
+_CHUNK_COLS = ("id", "position", "page_start", "page_end", "section", "char_count", "text")
+
+
 def get_chunks_for_source(source_id: int) -> list[dict]:
     """Get all chunks for a source.
 
@@ -249,51 +316,115 @@ def get_chunks_for_source(source_id: int) -> list[dict]:
             """,
             (source_id,)
         )
+        # Iterate the cursor directly instead of fetchall() so rows
+        # stream from the driver without a second full materialization
+        return [dict(zip(_CHUNK_COLS, row)) for row in cursor]
+
+
+def get_pending_embedding_chunks(limit: int = 500) -> list[dict]:
+    """Get chunks that need embeddings generated.
+
+    Args:
+        limit: Maximum number of chunks to return (for batching)
+
+    Returns:
+        List of chunk records with id, source_id, and text
+    """
+    with get_db_cursor(commit=False) as cursor:
+        cursor.execute(GET_PENDING_EMBEDDING_CHUNKS, (limit,))
         return [
             {
                 "id": row[0],
-                "position": row[1],
-                "page_start": row[2],
-                "page_end": row[3],
-                "section": row[4],
-                "char_count": row[5],
-                "text": row[6],
+                "source_id": row[1],
+                "text": row[2],
             }
             for row in cursor.fetchall()
         ]
 
 
-def get_pending_embedding_chunks(limit: int = 500) -> list[dict]:
-    """Get chunks that need embeddings generated.
+def claim_pending_embedding_chunks(limit: int = 500) -> list[dict]:
+    """Atomically claim chunks for embedding generation.
+
+    One statement flips the picked rows to PROCESSING and returns
+    them; rows locked by a concurrent worker are skipped (READPAST),
+    so overlapping timer runs never double-claim a chunk or pay for
+    the same API call twice. Claims abandoned by a dead worker go
+    back to PENDING via requeue_stale_claims.
 
     Args:
-        limit: Maximum number of chunks to return (for batching)
+        limit: Maximum number of chunks to claim
 
     Returns:
         List of chunk records with id, source_id, and text
     """
-    with get_db_cursor(commit=False) as cursor:
-        cursor.execute(
-            """
-            SELECT TOP (?) c.id, c.source_id, c.text, s.file_path
-            FROM chunks c
-            JOIN sources s ON c.source_id = s.id
-            WHERE c.embedding_status = 'PENDING'
-            ORDER BY c.source_id, c.position
-            """,
-            (limit,)
-        )
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(CLAIM_PENDING_EMBEDDING_CHUNKS, (limit,))
         return [
             {
                 "id": row[0],
                 "source_id": row[1],
                 "text": row[2],
-                "file_path": row[3],
             }
             for row in cursor.fetchall()
         ]
 
 
+def claim_pending_concept_chunks(limit: int = 200) -> list[dict]:
+    """Atomically claim chunks for concept extraction.
+
+    Same claim semantics as claim_pending_embedding_chunks, over the
+    concept-extraction eligibility predicate (embedding complete,
+    retries not exhausted).
+
+    Args:
+        limit: Maximum number of chunks to claim
+
+    Returns:
+        List of chunk records with id, source_id, and text
+    """
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(CLAIM_PENDING_CONCEPT_CHUNKS, (limit,))
+        return [
+            {
+                "id": row[0],
+                "source_id": row[1],
+                "text": row[2],
+            }
+            for row in cursor.fetchall()
+        ]
+
+
+def requeue_stale_claims(max_age_minutes: int = 15) -> int:
+    """Return expired PROCESSING claims to PENDING.
+
+    A worker that dies mid-batch (function timeout, crash) leaves its
+    claimed chunks in PROCESSING. Anything claimed longer ago than the
+    cutoff goes back to PENDING for the next run - the self-healing
+    guarantee the timer architecture depends on. The default sits just
+    past the function's 10-minute timeout, so a live run's claims are
+    never stolen.
+
+    Args:
+        max_age_minutes: Claim age after which a chunk is requeued
+
+    Returns:
+        Number of chunks requeued
+    """
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(REQUEUE_STALE_EMBEDDING_CLAIMS, (max_age_minutes,))
+        requeued = cursor.rowcount
+        cursor.execute(REQUEUE_STALE_CONCEPT_CLAIMS, (max_age_minutes,))
+        requeued += cursor.rowcount
+
+    if requeued:
+        structured_logger.info(
+            "store",
+            "Requeued stale claims",
+            requeued=requeued,
+        )
+    return requeued
+
+
 def update_chunk_embedding(
     chunk_id: int,
     embedding: list[float],
@@ -304,20 +435,43 @@ def update_chunk_embedding(
     Args:
         chunk_id: ID of chunk to update
         embedding: Embedding vector (1536 floats)
-        status: New embedding_status value
+        status: New embedding_status label
     """
-    embedding_json = json.dumps(embedding)
+    embedding_bin = _pack_embedding(embedding)
     with get_db_cursor(commit=True) as cursor:
         cursor.execute(
-            """
-            UPDATE chunks
-            SET embedding = ?, embedding_status = ?
-            WHERE id = ?
-            """,
-            (embedding_json, status, chunk_id)
+            UPDATE_CHUNK_EMBEDDING,
+            (embedding_bin, EMBEDDING_STATUS_CODES[status], chunk_id)
         )
 
 
+def update_chunk_embeddings_batch(
+    items: list[tuple[int, list[float]]],
+    status: str = "COMPLETE",
+) -> None:
+    """Update many chunks with their embeddings in one transaction.
+
+    Stages rows into a temp table with fast_executemany, then applies a
+    single UPDATE...JOIN. Three round-trips to Azure SQL regardless of
+    batch size, versus one commit per chunk with update_chunk_embedding.
+
+    Args:
+        items: List of (chunk_id, embedding) pairs
+        status: embedding_status label to set for all rows
+    """
+    if not items:
+        return
+
+    rows = [(chunk_id, _pack_embedding(embedding)) for chunk_id, embedding in items]
+    # durable=False: embeddings are replayable (status flips back to
+    # PENDING on loss), so the commit need not wait for the log flush
+    with get_db_cursor(commit=True, durable=False) as cursor:
+        cursor.execute(CREATE_EMBEDDING_STAGE)
+        cursor.fast_executemany = True
+        cursor.executemany(INSERT_EMBEDDING_STAGE, rows)
+        cursor.execute(APPLY_EMBEDDING_STAGE, (EMBEDDING_STATUS_CODES[status],))
+
+
 def update_chunk_embedding_failed(
     chunk_id: int,
     error_message: str,
@@ -330,13 +484,7 @@ def update_chunk_embedding_failed(
     """
     with get_db_cursor(commit=True) as cursor:
         cursor.execute(
-            """
-            UPDATE chunks
-            SET embedding_status = 'FAILED',
-                extraction_error = ?,
-                extraction_attempts = extraction_attempts + 1
-            WHERE id = ?
-            """,
+            MARK_EMBEDDING_FAILED,
             (error_message[:500], chunk_id)  # Truncate to column size
         )
 
@@ -353,24 +501,12 @@ def get_pending_concept_chunks(limit: int = 200) -> list[dict]:
         List of chunk records with id, source_id, and text
     """
     with get_db_cursor(commit=False) as cursor:
-        cursor.execute(
-            """
-            SELECT TOP (?) c.id, c.source_id, c.text, s.file_path
-            FROM chunks c
-            JOIN sources s ON c.source_id = s.id
-            WHERE c.embedding_status = 'COMPLETE'
-              AND c.concept_status = 'PENDING'
-              AND c.extraction_attempts < 3
-            ORDER BY c.source_id, c.position
-            """,
-            (limit,)
-        )
+        cursor.execute(GET_PENDING_CONCEPT_CHUNKS, (limit,))
         return [
             {
                 "id": row[0],
                 "source_id": row[1],
                 "text": row[2],
-                "file_path": row[3],
             }
             for row in cursor.fetchall()
         ]
@@ -385,29 +521,19 @@ def update_chunk_concept_status(
 
     Args:
         chunk_id: ID of chunk to update
-        status: New concept_status value ('EXTRACTED' or 'FAILED')
+        status: New concept_status label ('EXTRACTED' or 'FAILED')
         error_message: Optional error message for failures
     """
     with get_db_cursor(commit=True) as cursor:
         if error_message:
             cursor.execute(
-                """
-                UPDATE chunks
-                SET concept_status = ?,
-                    extraction_error = ?,
-                    extraction_attempts = extraction_attempts + 1
-                WHERE id = ?
-                """,
-                (status, error_message[:500], chunk_id)
+                MARK_CONCEPT_STATUS_WITH_ERROR,
+                (CONCEPT_STATUS_CODES[status], error_message[:500], chunk_id)
             )
         else:
             cursor.execute(
-                """
-                UPDATE chunks
-                SET concept_status = ?
-                WHERE id = ?
-                """,
-                (status, chunk_id)
+                MARK_CONCEPT_STATUS,
+                (CONCEPT_STATUS_CODES[status], chunk_id)
             )
 
 
@@ -421,17 +547,7 @@ def check_source_complete(source_id: int) -> bool:
         True if all chunks have embedding_status='COMPLETE' and concept_status='EXTRACTED'
     """
     with get_db_cursor(commit=False) as cursor:
-        cursor.execute(
-            """
-            SELECT
-                COUNT(*) as total,
-                SUM(CASE WHEN embedding_status = 'COMPLETE' THEN 1 ELSE 0 END) as embedded,
-                SUM(CASE WHEN concept_status = 'EXTRACTED' THEN 1 ELSE 0 END) as extracted
-            FROM chunks
-            WHERE source_id = ?
-            """,
-            (source_id,)
-        )
+        cursor.execute(CHECK_SOURCE_COMPLETE, (source_id,))
         row = cursor.fetchone()
         if row:
             total, embedded, extracted = row
@@ -445,29 +561,37 @@ def get_processing_stats() -> dict:
     Returns:
         Dict with counts of pending, complete, failed chunks
     """
+    # Map (status label) -> stats key, per status dimension
+    embedding_keys = {
+        "PENDING": "pending_embeddings",
+        "COMPLETE": "complete_embeddings",
+        "FAILED": "failed_embeddings",
+    }
+    concept_keys = {
+        "PENDING": "pending_concepts",
+        "EXTRACTED": "extracted_concepts",
+        "FAILED": "failed_concepts",
+    }
+
+    stats = {
+        "total_chunks": 0,
+        "pending_embeddings": 0,
+        "complete_embeddings": 0,
+        "failed_embeddings": 0,
+        "pending_concepts": 0,
+        "extracted_concepts": 0,
+        "failed_concepts": 0,
+    }
+
     with get_db_cursor(commit=False) as cursor:
-        cursor.execute(
-            """
-            SELECT
-                COUNT(*) as total_chunks,
-                SUM(CASE WHEN embedding_status = 'PENDING' THEN 1 ELSE 0 END) as pending_embeddings,
-                SUM(CASE WHEN embedding_status = 'COMPLETE' THEN 1 ELSE 0 END) as complete_embeddings,
-                SUM(CASE WHEN embedding_status = 'FAILED' THEN 1 ELSE 0 END) as failed_embeddings,
-                SUM(CASE WHEN concept_status = 'PENDING' THEN 1 ELSE 0 END) as pending_concepts,
-                SUM(CASE WHEN concept_status = 'EXTRACTED' THEN 1 ELSE 0 END) as extracted_concepts,
-                SUM(CASE WHEN concept_status = 'FAILED' THEN 1 ELSE 0 END) as failed_concepts
-            FROM chunks
-            """
-        )
-        row = cursor.fetchone()
-        if row:
-            return {
-                "total_chunks": row[0] or 0,
-                "pending_embeddings": row[1] or 0,
-                "complete_embeddings": row[2] or 0,
-                "failed_embeddings": row[3] or 0,
-                "pending_concepts": row[4] or 0,
-                "extracted_concepts": row[5] or 0,
-                "failed_concepts": row[6] or 0,
-            }
-        return {}
+        cursor.execute(PROCESSING_STATS)
+        for embedding_status, concept_status, count in cursor.fetchall():
+            stats["total_chunks"] += count
+            embedding_label = EMBEDDING_STATUS_LABELS.get(embedding_status)
+            concept_label = CONCEPT_STATUS_LABELS.get(concept_status)
+            if embedding_label in embedding_keys:
+                stats[embedding_keys[embedding_label]] += count
+            if concept_label in concept_keys:
+                stats[concept_keys[concept_label]] += count
+
+    return stats
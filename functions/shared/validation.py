@@ -6,6 +6,8 @@ Enforces cost controls and input contracts from System Behavior spec.
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
 
 class ValidationError(Exception):
     """Raised when document validation fails."""
@@ -62,16 +64,20 @@ def validate_file_size(size_bytes: int) -> ValidationResult:
     return ValidationResult(is_valid=True)
 
 
-def validate_pdf_magic_bytes(content: bytes) -> ValidationResult:
+def validate_pdf_magic_bytes(header: bytes | memoryview) -> ValidationResult:
     """Validate file is actually a PDF by checking magic bytes.
 
+    Only the first 5 bytes are examined, so callers can pass a
+    memoryview over the full content (or just the first few bytes of
+    the blob) without copying it.
+
     Args:
-        content: First bytes of the file
+        header: At least the first 5 bytes of the file
 
     Returns:
         ValidationResult with status and error message if invalid
     """
-    if not content.startswith(PDF_MAGIC_BYTES):
+    if bytes(header[: len(PDF_MAGIC_BYTES)]) != PDF_MAGIC_BYTES:
         return ValidationResult(
             is_valid=False,
             error_message="File does not have valid PDF magic bytes (not a real PDF)",
@@ -145,12 +151,19 @@ def validate_chunk_positions(chunks: list) -> ValidationResult:
     Returns:
         ValidationResult with status and error message if invalid
     """
-    positions = [c.position for c in chunks]
-    expected = list(range(len(chunks)))
-
-    if positions != expected:
+    # Vectorized comparison: one C-level pass instead of a Python loop,
+    # which matters when validating large batches of documents
+    positions = np.fromiter(
+        (c.position for c in chunks), dtype=np.int32, count=len(chunks)
+    )
+    expected = np.arange(len(chunks), dtype=np.int32)
+
+    if not np.array_equal(positions, expected):
         return ValidationResult(
             is_valid=False,
-            error_message=f"Chunk positions not sequential: got {positions}, expected {expected}",
+            error_message=(
+                f"Chunk positions not sequential: got {positions.tolist()}, "
+                f"expected {expected.tolist()}"
+            ),
         )
     return ValidationResult(is_valid=True)
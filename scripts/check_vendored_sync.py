@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Verify the vendored functions/shared/db modules match their canonical copies.
+
+The function app deploys only functions/, so shared/db/connection.py,
+models.py, and statements.py are vendored into functions/shared/db/.
+Two independently editable copies of SCHEMA_SQL (and friends) are a
+silent-drift footgun: init_db executes the canonical copy while the
+deployed functions import the vendored one, and a schema change that
+lands in only one of them fails in whichever environment got the stale
+copy. This check makes the drift loud.
+
+Run it before committing a change under shared/db/ or
+functions/shared/db/:
+
+    python scripts/check_vendored_sync.py
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# (canonical, vendored, body marker). connection.py is byte-identical;
+# models.py and statements.py carry an extra vendored-copy note in the
+# docstring, so they compare from the first line after it.
+PAIRS = [
+    ("shared/db/connection.py", "functions/shared/db/connection.py", None),
+    ("shared/db/models.py", "functions/shared/db/models.py",
+     "\n# Processing states"),
+    ("shared/db/statements.py", "functions/shared/db/statements.py",
+     "\nfrom .models import"),
+]
+
+
+def body(path: Path, marker: str | None) -> str:
+    """Read a file, skipping everything before the marker if given."""
+    text = path.read_text()
+    if marker is None:
+        return text
+    _, sep, rest = text.partition(marker)
+    if not sep:
+        raise SystemExit(f"Marker {marker!r} not found in {path}")
+    return marker + rest
+
+
+def main() -> int:
+    drifted = []
+    for canonical, vendored, marker in PAIRS:
+        if body(ROOT / canonical, marker) == body(ROOT / vendored, marker):
+            print(f"  ✓ {vendored} matches {canonical}")
+        else:
+            print(f"  ✗ {vendored} has drifted from {canonical}")
+            drifted.append((canonical, vendored))
+
+    if drifted:
+        print("\nVendored copies out of sync - re-copy the canonical body:")
+        for canonical, vendored in drifted:
+            print(f"  {canonical} -> {vendored}")
+        return 1
+
+    print("\nAll vendored copies in sync")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,6 +10,8 @@ Usage:
 """
 
 import argparse
+import asyncio
+import hashlib
 import json
 import os
 import sys
@@ -20,12 +22,30 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import anthropic
+import httpx
 
 from shared.db.connection import get_db_cursor
 
 # Model configuration
 EXTRACTION_MODEL = "claude-sonnet-4-20250514"
 
+# Concepts per shard prompt; shards run concurrently
+SHARD_SIZE = 40
+
+# Top concepts (by source count) repeated into every shard so the most
+# connective ideas can pair with concepts in any window
+SHARD_ANCHORS = 8
+
+# Concurrent in-flight Claude requests
+MAX_CONCURRENT_REQUESTS = 8
+
+# Pooled HTTP transport shared by all SDK calls in this process -
+# keep-alive connections avoid a TLS handshake per request
+_http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    timeout=httpx.Timeout(60.0, connect=10.0),
+)
+
 CROSS_SOURCE_PROMPT = """These concepts appear across multiple books/sources about data management.
 The sources they appear in are listed. Identify relationships between concepts from DIFFERENT sources.
 
@@ -57,6 +77,7 @@ def get_shared_concepts(cursor) -> list[dict]:
     """Get concepts that appear in 2+ sources."""
     cursor.execute("""
         SELECT
+            con.id,
             con.name,
             con.category,
             con.description,
@@ -72,69 +93,196 @@ def get_shared_concepts(cursor) -> list[dict]:
 
     return [
         {
-            "name": row[0],
-            "category": row[1],
-            "description": row[2],
-            "sources": row[3],
-            "source_count": row[4],
+            "id": row[0],
+            "name": row[1],
+            "category": row[2],
+            "description": row[3],
+            "sources": row[4],
+            "source_count": row[5],
         }
         for row in cursor.fetchall()
     ]
 
 
-def find_cross_source_relationships(
-    concepts: list[dict],
-    client: anthropic.Anthropic,
-) -> list[dict]:
-    """Ask Claude to identify cross-source relationships."""
-    if len(concepts) < 2:
-        return []
-
+def _build_prompt(concepts: list[dict]) -> str:
+    """Format the cross-source prompt for one shard of concepts."""
     concepts_with_sources = "\n".join([
         f"- {c['name']} ({c['category']}): appears in [{c['sources']}]"
         for c in concepts
     ])
+    return CROSS_SOURCE_PROMPT.format(concepts_with_sources=concepts_with_sources)
+
+
+def _shard_key(shard: list[dict]) -> bytes:
+    """Cache key for one shard: hash of its sorted concept names.
+
+    Source lists and descriptions are deliberately excluded - the
+    relationships Claude finds depend on which concepts are grouped
+    together, so the same group should hit cache even as mention
+    counts shift.
+    """
+    return hashlib.sha256("\n".join(sorted(c["name"] for c in shard)).encode()).digest()
 
-    prompt = CROSS_SOURCE_PROMPT.format(concepts_with_sources=concepts_with_sources)
 
-    response = client.messages.create(
-        model=EXTRACTION_MODEL,
-        max_tokens=2048,
-        messages=[{"role": "user", "content": prompt}],
+def _get_cached_responses(cursor, keys: list[bytes]) -> dict[bytes, list[dict]]:
+    """Look up cached shard responses by prompt hash."""
+    if not keys:
+        return {}
+
+    unique = list(set(keys))
+    placeholders = ", ".join("?" for _ in unique)
+    cursor.execute(
+        f"SELECT prompt_sha, response FROM llm_cache WHERE prompt_sha IN ({placeholders})",
+        unique,
     )
 
-    content = response.content[0].text
-    return json.loads(content)
+    return {bytes(row[0]): json.loads(row[1]) for row in cursor.fetchall()}
 
 
-def store_relationships(cursor, relationships: list[dict], dry_run: bool = False) -> int:
-    """Store cross-source relationships in database."""
-    created = 0
+async def _analyze_shards(
+    shards: list[list[dict]],
+    client: anthropic.AsyncAnthropic,
+) -> list[list[dict]]:
+    """Run one Claude request per shard with bounded concurrency."""
+    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
 
-    for rel in relationships:
-        if dry_run:
+    async def analyze(shard: list[dict]) -> list[dict]:
+        async with sem:
+            response = await client.messages.create(
+                model=EXTRACTION_MODEL,
+                max_tokens=2048,
+                messages=[{"role": "user", "content": _build_prompt(shard)}],
+            )
+        try:
+            return json.loads(response.content[0].text)
+        except json.JSONDecodeError as e:
+            print(f"  Warning: unparseable shard response, skipping ({e})")
+            return []
+
+    return await asyncio.gather(*(analyze(shard) for shard in shards))
+
+
+def find_cross_source_relationships(
+    concepts: list[dict],
+    client: anthropic.AsyncAnthropic,
+) -> list[dict]:
+    """Ask Claude to identify cross-source relationships.
+
+    Concepts are sharded into windows of SHARD_SIZE (with the
+    highest-source-count concepts anchored into every shard) and the
+    shards run concurrently. Each prompt stays well inside the context
+    window regardless of graph size, and wall-clock time scales with
+    shard count / concurrency rather than one serialized mega-request.
+
+    Shard responses are cached in llm_cache keyed by the shard's
+    concept names, so incremental runs after new ingests only pay
+    Claude for shards whose membership actually changed.
+    """
+    if len(concepts) < 2:
+        return []
+
+    # get_shared_concepts orders by source count descending, so the
+    # first rows are the most connective concepts
+    anchors = concepts[:SHARD_ANCHORS]
+    rest = concepts[SHARD_ANCHORS:]
+    window = max(SHARD_SIZE - len(anchors), 1)
+    shards = [
+        anchors + rest[i:i + window]
+        for i in range(0, len(rest), window)
+    ] or [anchors]
+
+    keys = [_shard_key(shard) for shard in shards]
+    with get_db_cursor() as cursor:
+        cached = _get_cached_responses(cursor, keys)
+
+    pending = [(shard, key) for shard, key in zip(shards, keys) if key not in cached]
+    if len(pending) < len(shards):
+        print(f"  {len(shards) - len(pending)} of {len(shards)} shards cached")
+
+    if pending:
+        fresh = asyncio.run(
+            _analyze_shards([shard for shard, _ in pending], client)
+        )
+        cache_rows = []
+        for (_, key), rels in zip(pending, fresh):
+            if key not in cached:
+                cached[key] = rels
+                cache_rows.append((key, json.dumps(rels)))
+        if cache_rows:
+            with get_db_cursor(commit=True) as cursor:
+                cursor.executemany(
+                    "INSERT INTO llm_cache (prompt_sha, response) VALUES (?, ?)",
+                    cache_rows,
+                )
+
+    shard_results = [cached[key] for key in keys]
+
+    # Deduplicate across shards (anchors appear in every shard)
+    seen: set[tuple[str, str, str]] = set()
+    relationships = []
+    for rels in shard_results:
+        for rel in rels:
+            key = (
+                rel.get("from", "").lower(),
+                rel.get("to", "").lower(),
+                rel.get("type", ""),
+            )
+            if key in seen:
+                continue
+            seen.add(key)
+            relationships.append(rel)
+
+    return relationships
+
+
+def store_relationships(
+    cursor,
+    relationships: list[dict],
+    concepts: list[dict],
+    dry_run: bool = False,
+) -> int:
+    """Store cross-source relationships in database.
+
+    Existing edges are prefetched once into a set and concept names
+    resolve to ids through an in-memory map, so deduplication and name
+    lookups cost one round-trip instead of a correlated subquery and
+    LOWER() joins per relationship. Survivors ship in one executemany
+    batch.
+    """
+    if dry_run:
+        for rel in relationships:
             print(f"  Would create: {rel['from']} --[{rel['type']}]--> {rel['to']}")
             print(f"    Reason: {rel.get('reason', 'N/A')}")
-            created += 1
+        return len(relationships)
+
+    cursor.execute("""
+        SELECT a.id, b.id
+        FROM related_to r
+        JOIN concepts a ON r.$from_id = a.$node_id
+        JOIN concepts b ON r.$to_id = b.$node_id
+    """)
+    existing = {(row[0], row[1]) for row in cursor.fetchall()}
+
+    name_to_id = {c["name"].lower(): c["id"] for c in concepts}
+
+    rows = []
+    for rel in relationships:
+        from_id = name_to_id.get(rel["from"].lower())
+        to_id = name_to_id.get(rel["to"].lower())
+        if from_id is None or to_id is None or (from_id, to_id) in existing:
             continue
+        rows.append((rel["type"], from_id, to_id))
+        print(f"  Creating: {rel['from']} --[{rel['type']}]--> {rel['to']}")
 
-        cursor.execute("""
+    if rows:
+        cursor.executemany("""
             INSERT INTO related_to ($from_id, $to_id, relationship_type, strength, source_id)
             SELECT c1.$node_id, c2.$node_id, ?, 0.6, NULL
             FROM concepts c1, concepts c2
-            WHERE LOWER(c1.name) = LOWER(?)
-              AND LOWER(c2.name) = LOWER(?)
-              AND NOT EXISTS (
-                  SELECT 1 FROM related_to r
-                  WHERE r.$from_id = c1.$node_id AND r.$to_id = c2.$node_id
-              )
-        """, (rel["type"], rel["from"], rel["to"]))
-
-        if cursor.rowcount > 0:
-            created += 1
-            print(f"  Created: {rel['from']} --[{rel['type']}]--> {rel['to']}")
+            WHERE c1.id = ? AND c2.id = ?
+        """, rows)
 
-    return created
+    return len(rows)
 
 
 def main():
@@ -159,7 +307,7 @@ def main():
         print("Error: ANTHROPIC_API_KEY environment variable not set")
         sys.exit(1)
 
-    client = anthropic.Anthropic(api_key=api_key)
+    client = anthropic.AsyncAnthropic(api_key=api_key, http_client=_http_client)
 
     # Get shared concepts
     print("Finding concepts shared across sources...")
@@ -200,7 +348,7 @@ def main():
     print(f"{mode} relationships...")
 
     with get_db_cursor(commit=not args.dry_run) as cursor:
-        created = store_relationships(cursor, relationships, dry_run=args.dry_run)
+        created = store_relationships(cursor, relationships, concepts, dry_run=args.dry_run)
 
     print()
     print(f"{'Would create' if args.dry_run else 'Created'} {created} relationships")
@@ -8,14 +8,18 @@ Usage:
     python scripts/embedding_similarity_pass.py                    # Run with default threshold
     python scripts/embedding_similarity_pass.py --threshold 0.8    # Custom threshold
     python scripts/embedding_similarity_pass.py --dry-run          # Preview without changes
+    python scripts/embedding_similarity_pass.py --async-batch      # Batch API (cheaper, slower)
 """
 
 import argparse
+import hashlib
 import json
 import os
 import sys
+import time
 from pathlib import Path
 
+import httpx
 import numpy as np
 
 # Add project root to path for imports
@@ -23,32 +27,139 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from openai import OpenAI
 
+try:
+    # Optional: tiled multithreaded elementwise kernels for the
+    # threshold/mask stage on large score matrices
+    import numexpr
+except ImportError:
+    numexpr = None
+
 from shared.db.connection import get_db_cursor
 
 # Default similarity threshold
 DEFAULT_THRESHOLD = 0.85
 
+# Inputs per embeddings.create call (API caps at 2048 inputs/request)
+EMBED_BATCH_SIZE = 256
+
+# Retry configuration for embedding API calls
+MAX_RETRIES = 3
+
+# Seconds between Batch API status polls (--async-batch)
+BATCH_POLL_SECONDS = 60
+
+# Side files for --mmap-cache: the embedding matrix as raw float32 plus
+# a parallel int64 id vector, loadable in one np.memmap call
+EMBEDDING_DIM = 1536
+_CACHE_DIR = Path(__file__).parent.parent / "data"
+_MATRIX_CACHE = _CACHE_DIR / "embeddings.f32"
+_IDS_CACHE = _CACHE_DIR / "embedding_ids.npy"
+
+# Pooled HTTP transport shared by all SDK calls in this process -
+# keep-alive connections avoid a TLS handshake per request
+_http_client = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    timeout=httpx.Timeout(60.0, connect=10.0),
+)
+
+# Shared UPDATE for embedding writeback (sync and batch paths). The
+# full-precision vector ships as 6144 raw float32 bytes into
+# embedding_bin (same layout as chunks.embedding_bin), instead of
+# ~18 KB of JSON text per row; the legacy JSON embedding column is
+# read-only fallback for rows written before embedding_bin existed.
+_UPDATE_EMBEDDING_SQL = """
+    UPDATE concepts
+    SET embedding_bin = ?,
+        embedding_i8 = ?,
+        embedding_scale = ?,
+        description_sha256 = ?,
+        updated_at = GETDATE()
+    WHERE id = ?
+"""
+
 
-def cosine_similarity(a: list[float], b: list[float]) -> float:
-    """Calculate cosine similarity between two vectors."""
-    a = np.array(a)
-    b = np.array(b)
-    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+def _concept_text(name: str, description: str) -> str:
+    """Text that gets embedded for a concept (also the cache key input)."""
+    return f"{name}: {description}"
 
 
 def get_concepts_needing_embeddings(cursor) -> list[dict]:
-    """Get concepts with descriptions but no embeddings."""
+    """Get concepts whose embedding is missing or stale.
+
+    Compares each description's content hash against the stored
+    description_sha256, so edited descriptions are re-embedded instead
+    of being skipped forever by an embedding IS NULL filter.
+    """
     cursor.execute("""
-        SELECT id, name, description
+        SELECT id, name, description, description_sha256
         FROM concepts
         WHERE description IS NOT NULL
-          AND embedding IS NULL
     """)
 
-    return [
-        {"id": row[0], "name": row[1], "description": row[2]}
-        for row in cursor.fetchall()
-    ]
+    needing = []
+    for concept_id, name, description, stored_hash in cursor.fetchall():
+        current = hashlib.sha256(_concept_text(name, description).encode()).digest()
+        if stored_hash is None or bytes(stored_hash) != current:
+            needing.append({"id": concept_id, "name": name, "description": description})
+
+    return needing
+
+
+def _embedding_update_row(
+    concept_id: int,
+    embedding: list[float],
+    content_hash: bytes,
+) -> tuple[bytes, bytes, float, bytes, int]:
+    """Build an UPDATE parameter row for one concept embedding.
+
+    The full-precision vector ships as its raw little-endian float32
+    buffer (half the bytes of the JSON encoding, no server-side text
+    parse). Also applies symmetric int8 quantization: unit-normalize,
+    then scale the largest component to 127. Stored alongside the
+    full-precision column so similarity scans can read 4x fewer bytes.
+    """
+    vec = np.asarray(embedding, dtype=np.float32)
+    buf = vec.tobytes()
+
+    norm = float(np.linalg.norm(vec))
+    if norm > 0:
+        vec = vec / norm
+    scale = float(np.abs(vec).max() / 127.0) or 1.0
+    quantized = np.round(vec / scale).astype(np.int8)
+
+    return (buf, quantized.tobytes(), scale, content_hash, concept_id)
+
+
+def _get_cached_embeddings(cursor, hashes: list[bytes]) -> dict[bytes, list[float]]:
+    """Look up cached embeddings for a batch of content hashes."""
+    if not hashes:
+        return {}
+
+    unique = list(set(hashes))
+    placeholders = ", ".join("?" for _ in unique)
+    cursor.execute(
+        f"SELECT sha256, embedding FROM embeddings_cache WHERE sha256 IN ({placeholders})",
+        unique,
+    )
+
+    return {bytes(row[0]): json.loads(row[1]) for row in cursor.fetchall()}
+
+
+def _embed_batch(client: OpenAI, texts: list[str]) -> list[list[float]]:
+    """Call the embeddings API with exponential backoff retry."""
+    for attempt in range(MAX_RETRIES):
+        try:
+            response = client.embeddings.create(
+                input=texts,
+                model="text-embedding-3-small",
+            )
+            return [item.embedding for item in response.data]
+        except Exception as e:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            wait = 2 ** (attempt + 1)  # 2s, 4s
+            print(f"  Embedding batch failed ({e}), retrying in {wait}s...")
+            time.sleep(wait)
 
 
 def generate_concept_embeddings(
@@ -56,114 +167,497 @@ def generate_concept_embeddings(
     concepts: list[dict],
     client: OpenAI,
 ) -> int:
-    """Generate and store embeddings for concepts."""
-    if not concepts:
-        return 0
-
-    texts = [f"{c['name']}: {c['description']}" for c in concepts]
-
-    # Batch embedding generation
-    response = client.embeddings.create(
-        input=texts,
-        model="text-embedding-3-small",
-    )
+    """Generate and store embeddings for concepts.
+
+    Requests go out in sub-batches of EMBED_BATCH_SIZE so large corpora
+    stay under the API's per-request input cap, and each batch's
+    updates ship as one executemany round-trip. Texts are hashed and
+    checked against embeddings_cache first, so unchanged or duplicate
+    descriptions never hit the API twice.
+    """
+    embedded = 0
+
+    for start in range(0, len(concepts), EMBED_BATCH_SIZE):
+        batch = concepts[start:start + EMBED_BATCH_SIZE]
+        texts = [_concept_text(c["name"], c["description"]) for c in batch]
+        hashes = [hashlib.sha256(t.encode()).digest() for t in texts]
+
+        cached = _get_cached_embeddings(cursor, hashes)
+
+        # Only the cache misses go to the API (deduplicated within batch)
+        miss_texts: list[str] = []
+        miss_hashes: list[bytes] = []
+        for text, content_hash in zip(texts, hashes):
+            if content_hash not in cached and content_hash not in miss_hashes:
+                miss_texts.append(text)
+                miss_hashes.append(content_hash)
+
+        if miss_texts:
+            fresh = _embed_batch(client, miss_texts)
+            cache_rows = []
+            for content_hash, embedding in zip(miss_hashes, fresh):
+                cached[content_hash] = embedding
+                cache_rows.append((content_hash, json.dumps(embedding)))
+            cursor.executemany(
+                "INSERT INTO embeddings_cache (sha256, embedding) VALUES (?, ?)",
+                cache_rows,
+            )
+
+        rows = [
+            _embedding_update_row(concept["id"], cached[content_hash], content_hash)
+            for concept, content_hash in zip(batch, hashes)
+        ]
+        cursor.fast_executemany = True
+        cursor.executemany(_UPDATE_EMBEDDING_SQL, rows)
+
+        embedded += len(batch)
+        if len(concepts) > EMBED_BATCH_SIZE:
+            print(f"  Embedded {embedded}/{len(concepts)} concepts...")
+
+    return embedded
+
+
+def generate_concept_embeddings_async_batch(
+    cursor,
+    concepts: list[dict],
+    client: OpenAI,
+) -> int:
+    """Generate embeddings via the asynchronous Batch API.
 
-    embeddings = [item.embedding for item in response.data]
+    Uploads one JSONL request per concept (custom_id = concept id),
+    creates a batch against /v1/embeddings with a 24h completion
+    window, polls until it finishes, and stores results matched back by
+    custom_id. Half the per-token cost of the synchronous endpoint and
+    no rate-limit stalls - suited to the overnight run-after-ingest
+    workflow where latency is irrelevant.
+    """
+    import io
 
-    # Store embeddings
-    for concept, embedding in zip(concepts, embeddings):
-        embedding_json = json.dumps(embedding)
-        cursor.execute("""
-            UPDATE concepts
-            SET embedding = CAST(? AS VECTOR(1536)), updated_at = GETDATE()
-            WHERE id = ?
-        """, (embedding_json, concept["id"]))
+    if not concepts:
+        return 0
 
-    return len(concepts)
+    texts = {c["id"]: _concept_text(c["name"], c["description"]) for c in concepts}
+    hashes = {cid: hashlib.sha256(t.encode()).digest() for cid, t in texts.items()}
+
+    # Resolve cache hits locally; only misses go into the batch job
+    cached: dict[bytes, list[float]] = {}
+    all_hashes = list(hashes.values())
+    for start in range(0, len(all_hashes), EMBED_BATCH_SIZE):
+        cached.update(
+            _get_cached_embeddings(cursor, all_hashes[start:start + EMBED_BATCH_SIZE])
+        )
+
+    rows = [
+        _embedding_update_row(c["id"], cached[hashes[c["id"]]], hashes[c["id"]])
+        for c in concepts
+        if hashes[c["id"]] in cached
+    ]
+    to_submit = [c for c in concepts if hashes[c["id"]] not in cached]
+
+    if to_submit:
+        lines = [
+            json.dumps({
+                "custom_id": str(c["id"]),
+                "method": "POST",
+                "url": "/v1/embeddings",
+                "body": {
+                    "model": "text-embedding-3-small",
+                    "input": texts[c["id"]],
+                },
+            })
+            for c in to_submit
+        ]
+        payload = io.BytesIO("\n".join(lines).encode("utf-8"))
+
+        batch_file = client.files.create(file=payload, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/embeddings",
+            completion_window="24h",
+        )
+        print(f"  Submitted batch {batch.id} ({len(to_submit)} requests)")
+
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(BATCH_POLL_SECONDS)
+            batch = client.batches.retrieve(batch.id)
+            print(f"  Batch status: {batch.status}")
+
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch {batch.id} ended with status: {batch.status}")
+
+        by_id = {str(c["id"]): c for c in to_submit}
+        output = client.files.content(batch.output_file_id).text
+
+        cache_rows = []
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            concept = by_id.get(result["custom_id"])
+            if concept is None or result.get("error"):
+                continue
+            embedding = result["response"]["body"]["data"][0]["embedding"]
+            content_hash = hashes[concept["id"]]
+            rows.append(_embedding_update_row(concept["id"], embedding, content_hash))
+            if content_hash not in cached:
+                cached[content_hash] = embedding
+                cache_rows.append((content_hash, json.dumps(embedding)))
+
+        if cache_rows:
+            cursor.executemany(
+                "INSERT INTO embeddings_cache (sha256, embedding) VALUES (?, ?)",
+                cache_rows,
+            )
+
+    cursor.fast_executemany = True
+    cursor.executemany(_UPDATE_EMBEDDING_SQL, rows)
+    return len(rows)
 
 
 def get_concepts_with_embeddings(cursor) -> list[dict]:
-    """Get all concepts that have embeddings."""
+    """Get all concepts that have embeddings.
+
+    Embeddings are converted once to contiguous float32 arrays and
+    L2-normalized at load time, so downstream similarity math runs on
+    SIMD-friendly buffers and cosine collapses to a plain dot product -
+    no per-comparison list wrapping or norm recomputation. When the
+    int8-quantized column is populated it is preferred: a quarter of
+    the bytes come off the wire and dequantization is one vectorized
+    multiply instead of parsing ~1536 floats from JSON.
+    """
     cursor.execute("""
-        SELECT id, name, embedding
+        SELECT id, name, embedding, embedding_bin, embedding_i8, embedding_scale
         FROM concepts
-        WHERE embedding IS NOT NULL
+        WHERE embedding_bin IS NOT NULL OR embedding IS NOT NULL
     """)
 
     concepts = []
-    for row in cursor.fetchall():
-        # Parse embedding from database
-        embedding = row[2]
-        if isinstance(embedding, str):
-            embedding = json.loads(embedding)
-        elif hasattr(embedding, "__iter__"):
-            embedding = list(embedding)
+    for concept_id, name, embedding, embedding_bin, embedding_i8, scale in cursor.fetchall():
+        if embedding_i8 is not None and scale is not None:
+            vec = np.frombuffer(embedding_i8, dtype=np.int8).astype(np.float32)
+            vec *= scale
+        elif embedding_bin is not None:
+            # Full-precision binary encoding (raw little-endian FP32)
+            vec = np.frombuffer(embedding_bin, dtype=np.float32).astype(np.float32)
+        else:
+            # JSON fallback for rows written before the binary columns
+            if isinstance(embedding, str):
+                embedding = json.loads(embedding)
+            vec = np.ascontiguousarray(embedding, dtype=np.float32)
+
+        vec /= np.linalg.norm(vec) + 1e-12
 
         concepts.append({
-            "id": row[0],
-            "name": row[1],
-            "embedding": embedding,
+            "id": concept_id,
+            "name": name,
+            "embedding": vec,
         })
 
     return concepts
 
 
+def _write_embedding_cache(concepts: list[dict]) -> None:
+    """Persist loaded embeddings to the mmap side files."""
+    _CACHE_DIR.mkdir(exist_ok=True)
+    with open(_MATRIX_CACHE, "wb") as f:
+        f.write(_embedding_matrix(concepts).tobytes())
+    np.save(_IDS_CACHE, np.asarray([c["id"] for c in concepts], dtype=np.int64))
+
+
+def _load_embedding_cache(cursor) -> list[dict] | None:
+    """Load concepts from the mmap side files, if present and current.
+
+    Raw float32 reads at memory-bandwidth speed versus ~50 MB/s for the
+    JSON decode the SQL path pays, and names come from a narrow SELECT
+    that never touches the embedding columns. Returns None (caller
+    falls back to SQL) when the files are missing or the cached id set
+    no longer matches the database.
+    """
+    if not (_MATRIX_CACHE.exists() and _IDS_CACHE.exists()):
+        return None
+
+    ids = np.load(_IDS_CACHE)
+    matrix = np.memmap(
+        _MATRIX_CACHE, dtype=np.float32, mode="r", shape=(len(ids), EMBEDDING_DIM)
+    )
+
+    cursor.execute(
+        "SELECT id, name FROM concepts "
+        "WHERE embedding_bin IS NOT NULL OR embedding IS NOT NULL"
+    )
+    names = {row[0]: row[1] for row in cursor.fetchall()}
+
+    if {int(cid) for cid in ids} != set(names):
+        return None
+
+    return [
+        {"id": int(cid), "name": names[int(cid)], "embedding": matrix[i]}
+        for i, cid in enumerate(ids)
+    ]
+
+
+def _embedding_matrix(concepts: list[dict]) -> np.ndarray:
+    """Stack pre-normalized concept embeddings into an (N, dim) matrix.
+
+    Rows are unit-length already (normalized once at load time in
+    get_concepts_with_embeddings), so no per-call norm pass is needed.
+    """
+    return np.asarray([c["embedding"] for c in concepts], dtype=np.float32)
+
+
+# Above this many concepts the dense N x N score matrix becomes the
+# memory bottleneck (8192^2 float32 = 256 MB); tile the matmul instead
+DENSE_CUTOFF = 8192
+
+# Tile edge for the blocked scan: a 2048^2 float32 output tile is
+# 16 MB, small enough to stay cache-resident through the threshold pass
+BLOCK_SIZE = 2048
+
+
+def _pairs_above_blocked(
+    matrix: np.ndarray,
+    threshold: float,
+) -> list[tuple[int, int, float]]:
+    """Cache-blocked variant of the all-pairs similarity scan.
+
+    Scores BLOCK_SIZE x BLOCK_SIZE tiles of the upper triangle, so each
+    SGEMM call produces an output that fits in cache and peak memory is
+    O(BLOCK^2) instead of the O(N^2) dense matrix. Diagonal tiles mask
+    their own lower triangle so each pair is still scored exactly once.
+
+    The resident matrix is held in float16 - normalized cosine inputs
+    are bounded in [-1, 1], where half precision keeps ~3 decimal
+    digits, plenty for a 2-decimal threshold - halving the memory
+    traffic this scan is bound by. Tiles upcast to float32 at the gemm
+    (numpy has no fast fp16 kernels) so accumulation stays in full
+    precision.
+    """
+    half = matrix.astype(np.float16)
+    hits = []
+    n = half.shape[0]
+    for i0 in range(0, n, BLOCK_SIZE):
+        block = half[i0:i0 + BLOCK_SIZE].astype(np.float32)
+        for j0 in range(i0, n, BLOCK_SIZE):
+            tile = block @ half[j0:j0 + BLOCK_SIZE].astype(np.float32).T
+            if i0 == j0:
+                indices = _upper_pairs_above(tile, threshold)
+            else:
+                indices = np.argwhere(tile >= threshold)
+            for a, b in indices:
+                hits.append((i0 + int(a), j0 + int(b), float(tile[a, b])))
+    return hits
+
+
+def _upper_pairs_above(scores: np.ndarray, threshold: float) -> np.ndarray:
+    """Indices of upper-triangle (i < j) scores at or above threshold.
+
+    The compare-and-mask step is elementwise over the full N x N
+    matrix. With numexpr installed it runs as one tiled multithreaded
+    pass with no intermediate allocations (the numpy path materializes
+    a full triu copy plus a boolean mask); plain numpy otherwise.
+    """
+    if numexpr is not None:
+        n = scores.shape[0]
+        mask = numexpr.evaluate(
+            "(scores >= threshold) & (rows < cols)",
+            local_dict={
+                "scores": scores,
+                "threshold": threshold,
+                "rows": np.arange(n)[:, None],
+                "cols": np.arange(n)[None, :],
+            },
+        )
+        return np.argwhere(mask)
+
+    return np.argwhere(np.triu(scores, k=1) >= threshold)
+
+
 def find_similar_pairs(
     concepts: list[dict],
     threshold: float,
 ) -> list[tuple[dict, dict, float]]:
-    """Find all concept pairs above similarity threshold."""
+    """Find all concept pairs above similarity threshold.
+
+    Computes all pairwise cosine similarities as a single matrix
+    product on the unit-length rows, so the N^2 comparisons run as one
+    BLAS call instead of a Python double loop. Past DENSE_CUTOFF
+    concepts the scan switches to the cache-blocked tiling that never
+    materializes the full score matrix.
+    """
+    matrix = _embedding_matrix(concepts)
+
+    if len(concepts) > DENSE_CUTOFF:
+        similar = [
+            (concepts[i], concepts[j], score)
+            for i, j, score in _pairs_above_blocked(matrix, threshold)
+        ]
+    else:
+        scores = matrix @ matrix.T
+
+        # Keep only the upper triangle so each pair is scored once and
+        # self-similarity is excluded
+        indices = _upper_pairs_above(scores, threshold)
+
+        similar = [
+            (concepts[i], concepts[j], float(scores[i, j]))
+            for i, j in indices
+        ]
+
+    # Sort by similarity descending
+    similar.sort(key=lambda x: x[2], reverse=True)
+
+    return similar
+
+
+def find_similar_pairs_bucketed(
+    concepts: list[dict],
+    threshold: float,
+    n_bits: int = 8,
+    seed: int = 0,
+) -> list[tuple[dict, dict, float]]:
+    """Find similar pairs with random-projection bucket pruning.
+
+    Hashes each unit vector to an n_bits sign signature under a fixed
+    random projection, then only scores pairs whose signatures match or
+    differ by a single bit. Similar vectors almost always agree on most
+    projection signs, so the candidate set shrinks by orders of
+    magnitude versus the all-pairs scan. Approximate: pairs that land
+    further apart in hash space are missed, so use this for graphs too
+    large for exact search.
+    """
+    matrix = _embedding_matrix(concepts)
+
+    rng = np.random.default_rng(seed)
+    projection = rng.standard_normal((matrix.shape[1], n_bits)).astype(np.float32)
+    signs = (matrix @ projection) > 0
+
+    # n_bits <= 8 packs each signature into one byte
+    codes = np.packbits(signs, axis=1)[:, 0]
+
+    buckets: dict[int, list[int]] = {}
+    for i, code in enumerate(codes):
+        buckets.setdefault(int(code), []).append(i)
+
     similar = []
 
-    for i, c1 in enumerate(concepts):
-        for c2 in concepts[i + 1:]:
-            similarity = cosine_similarity(c1["embedding"], c2["embedding"])
+    for code, members in buckets.items():
+        # Pairs within the bucket
+        block = matrix[members]
+        scores = np.triu(block @ block.T, k=1)
+        for a, b in np.argwhere(scores >= threshold):
+            similar.append(
+                (concepts[members[a]], concepts[members[b]], float(scores[a, b]))
+            )
+
+        # Pairs against 1-bit-flip neighbor buckets; the neighbor > code
+        # check visits each unordered bucket pair once
+        for bit in range(n_bits):
+            neighbor = code ^ (1 << bit)
+            if neighbor <= code or neighbor not in buckets:
+                continue
+            other = buckets[neighbor]
+            cross = block @ matrix[other].T
+            for a, b in np.argwhere(cross >= threshold):
+                similar.append(
+                    (concepts[members[a]], concepts[other[b]], float(cross[a, b]))
+                )
+
+    similar.sort(key=lambda x: x[2], reverse=True)
+
+    return similar
+
+
+def find_similar_pairs_ann(
+    concepts: list[dict],
+    threshold: float,
+    k: int = 20,
+) -> list[tuple[dict, dict, float]]:
+    """Find similar pairs with an approximate HNSW index.
+
+    Queries each concept's top-k neighbors through an hnswlib proximity
+    graph instead of the exact all-pairs matmul - roughly N log N, for
+    concept graphs too large for the O(N^2) scan. Requires the optional
+    hnswlib package.
+
+    Raises:
+        ImportError: If hnswlib is not installed
+    """
+    import hnswlib
+
+    matrix = _embedding_matrix(concepts)
+
+    index = hnswlib.Index(space="cosine", dim=matrix.shape[1])
+    index.init_index(max_elements=len(concepts), ef_construction=200, M=16)
+    index.add_items(matrix, np.arange(len(concepts)))
+    index.set_ef(64)
+
+    labels, distances = index.knn_query(matrix, k=min(k, len(concepts)))
+
+    similar = []
+    for i, (neighbors, dists) in enumerate(zip(labels, distances)):
+        for j, dist in zip(neighbors, dists):
+            # i < j keeps each pair once and skips self-matches
+            if j <= i:
+                continue
+            similarity = 1.0 - float(dist)
             if similarity >= threshold:
-                similar.append((c1, c2, similarity))
+                similar.append((concepts[i], concepts[int(j)], similarity))
 
-    # Sort by similarity descending
     similar.sort(key=lambda x: x[2], reverse=True)
 
     return similar
 
 
+def _get_existing_related_pairs(cursor) -> set[tuple[int, int]]:
+    """Fetch all existing related_to edges as (from_id, to_id) pairs."""
+    cursor.execute("""
+        SELECT a.id, b.id
+        FROM related_to r
+        JOIN concepts a ON r.$from_id = a.$node_id
+        JOIN concepts b ON r.$to_id = b.$node_id
+    """)
+    return {(row[0], row[1]) for row in cursor.fetchall()}
+
+
 def store_similar_relationships(
     cursor,
     pairs: list[tuple[dict, dict, float]],
     dry_run: bool = False,
 ) -> int:
-    """Store similar_to edges for concept pairs."""
-    created = 0
-
-    for c1, c2, similarity in pairs:
-        if dry_run:
+    """Store similar_to edges for concept pairs.
+
+    Existing edges are prefetched once into an in-memory set and pairs
+    are filtered locally, so deduplication costs one round-trip instead
+    of a correlated NOT EXISTS per inserted row. Survivors ship in a
+    single fast_executemany batch.
+
+    Returns:
+        Number of new edges inserted
+    """
+    if dry_run:
+        for c1, c2, similarity in pairs:
             print(f"  Would create: {c1['name']} <--similar_to--> {c2['name']} ({similarity:.3f})")
-            created += 1
-            continue
+        return len(pairs)
 
-        # Check if relationship already exists
-        cursor.execute("""
-            SELECT 1 FROM related_to r, concepts a, concepts b
-            WHERE r.$from_id = a.$node_id AND r.$to_id = b.$node_id
-              AND ((a.id = ? AND b.id = ?) OR (a.id = ? AND b.id = ?))
-        """, (c1["id"], c2["id"], c2["id"], c1["id"]))
+    existing = _get_existing_related_pairs(cursor)
 
-        if cursor.fetchone():
+    rows = []
+    for c1, c2, similarity in pairs:
+        if (c1["id"], c2["id"]) in existing or (c2["id"], c1["id"]) in existing:
             continue
+        rows.append((similarity, c1["id"], c2["id"]))
+        print(f"  Creating: {c1['name']} <--similar_to--> {c2['name']} ({similarity:.3f})")
 
-        # Create relationship
-        cursor.execute("""
+    if rows:
+        cursor.fast_executemany = True
+        cursor.executemany("""
             INSERT INTO related_to ($from_id, $to_id, relationship_type, strength)
             SELECT a.$node_id, b.$node_id, 'similar_to', ?
             FROM concepts a, concepts b
             WHERE a.id = ? AND b.id = ?
-        """, (similarity, c1["id"], c2["id"]))
-
-        if cursor.rowcount > 0:
-            created += 1
-            print(f"  Created: {c1['name']} <--similar_to--> {c2['name']} ({similarity:.3f})")
+        """, rows)
 
-    return created
+    return len(rows)
 
 
 def main():
@@ -181,6 +675,26 @@ def main():
         action="store_true",
         help="Preview similar pairs without storing",
     )
+    parser.add_argument(
+        "--async-batch",
+        action="store_true",
+        help="Generate embeddings via the Batch API (50%% cost, up to 24h)",
+    )
+    parser.add_argument(
+        "--ann",
+        action="store_true",
+        help="Use approximate HNSW search (requires hnswlib; for large graphs)",
+    )
+    parser.add_argument(
+        "--prune-buckets",
+        action="store_true",
+        help="Prune candidate pairs via random-projection buckets (approximate)",
+    )
+    parser.add_argument(
+        "--mmap-cache",
+        action="store_true",
+        help="Load embeddings from a memory-mapped side file (skips SQL decode)",
+    )
     args = parser.parse_args()
 
     print("=" * 55)
@@ -195,16 +709,22 @@ def main():
         print("Error: OPENAI_API_KEY environment variable not set")
         sys.exit(1)
 
-    client = OpenAI(api_key=api_key)
+    client = OpenAI(api_key=api_key, http_client=_http_client)
 
     # Step 1: Generate embeddings for concepts that don't have them
     print("Checking for concepts needing embeddings...")
+    embedded = 0
     with get_db_cursor(commit=True) as cursor:
         concepts_to_embed = get_concepts_needing_embeddings(cursor)
 
         if concepts_to_embed:
             print(f"  Generating embeddings for {len(concepts_to_embed)} concepts...")
-            embedded = generate_concept_embeddings(cursor, concepts_to_embed, client)
+            if args.async_batch:
+                embedded = generate_concept_embeddings_async_batch(
+                    cursor, concepts_to_embed, client
+                )
+            else:
+                embedded = generate_concept_embeddings(cursor, concepts_to_embed, client)
             print(f"  Generated {embedded} embeddings")
         else:
             print("  All concepts have embeddings")
@@ -213,7 +733,16 @@ def main():
     # Step 2: Get concepts with embeddings
     print("Loading concepts with embeddings...")
     with get_db_cursor() as cursor:
-        concepts = get_concepts_with_embeddings(cursor)
+        concepts = None
+        if args.mmap_cache and embedded == 0:
+            concepts = _load_embedding_cache(cursor)
+            if concepts is not None:
+                print("  Loaded from mmap cache")
+        if concepts is None:
+            concepts = get_concepts_with_embeddings(cursor)
+            if args.mmap_cache:
+                _write_embedding_cache(concepts)
+                print("  Refreshed mmap cache")
 
     print(f"  Found {len(concepts)} concepts with embeddings")
     print()
@@ -224,7 +753,16 @@ def main():
 
     # Step 3: Find similar pairs
     print(f"Finding pairs with similarity >= {args.threshold}...")
-    pairs = find_similar_pairs(concepts, args.threshold)
+    if args.prune_buckets:
+        pairs = find_similar_pairs_bucketed(concepts, args.threshold)
+    elif args.ann:
+        try:
+            pairs = find_similar_pairs_ann(concepts, args.threshold)
+        except ImportError:
+            print("  hnswlib not installed - falling back to exact search")
+            pairs = find_similar_pairs(concepts, args.threshold)
+    else:
+        pairs = find_similar_pairs(concepts, args.threshold)
     print(f"  Found {len(pairs)} similar pairs")
     print()
 
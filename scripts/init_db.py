@@ -12,36 +12,48 @@ Usage:
 """
 
 import argparse
+import re
 import sys
 from pathlib import Path
 
 # Add project root to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from shared.db.connection import get_db_cursor
+from shared.db.connection import get_connection, get_db_cursor
 from shared.db.models import (
     SCHEMA_SQL,
     DROP_SCHEMA_SQL,
     CHECK_SCHEMA_SQL,
+    FULLTEXT_SQL,
     MIGRATION_ADD_CHUNK_STATUS_SQL,
 )
 
 
-def check_connection() -> bool:
+def split_batches(sql: str) -> list[str]:
+    """Split a T-SQL script into batches on GO delimiter lines.
+
+    GO is a batch separator, not a statement, so each batch between
+    delimiters executes as one round-trip. This also stays correct for
+    statements that contain semicolons in bodies (triggers, procedures),
+    which a naive split-on-';' parser breaks on.
+    """
+    return [batch.strip() for batch in re.split(r"(?im)^\s*GO\s*$", sql) if batch.strip()]
+
+
+def check_connection(cursor) -> bool:
     """Test database connection works."""
     print("Testing Azure SQL connection...")
     try:
-        with get_db_cursor() as cursor:
-            cursor.execute("SELECT @@VERSION;")
-            version = cursor.fetchone()[0]
-            print(f"  Connected: {version[:60]}...")
-            return True
+        cursor.execute("SELECT @@VERSION;")
+        version = cursor.fetchone()[0]
+        print(f"  Connected: {version[:60]}...")
+        return True
     except Exception as e:
         print(f"  Connection failed: {e}")
         return False
 
 
-def check_schema() -> dict:
+def check_schema(cursor) -> dict:
     """Check current schema status.
 
     Returns:
@@ -49,105 +61,104 @@ def check_schema() -> dict:
     """
     print("Checking schema status...")
     try:
-        with get_db_cursor() as cursor:
-            # Check for NODE/EDGE tables
-            cursor.execute("""
-                SELECT TABLE_NAME
-                FROM INFORMATION_SCHEMA.TABLES
-                WHERE TABLE_SCHEMA = 'dbo'
-                  AND TABLE_NAME IN ('sources', 'chunks', 'concepts',
-                                     'from_source', 'covers', 'mentions', 'related_to')
-            """)
-            tables = [row[0] for row in cursor.fetchall()]
-
-            if tables:
-                print(f"  Found tables: {', '.join(tables)}")
-            else:
-                print("  No schema tables found")
+        # Check for NODE/EDGE tables
+        cursor.execute("""
+            SELECT TABLE_NAME
+            FROM INFORMATION_SCHEMA.TABLES
+            WHERE TABLE_SCHEMA = 'dbo'
+              AND TABLE_NAME IN ('sources', 'chunks', 'concepts',
+                                 'covers', 'mentions', 'related_to')
+        """)
+        tables = [row[0] for row in cursor.fetchall()]
+
+        if tables:
+            print(f"  Found tables: {', '.join(tables)}")
+        else:
+            print("  No schema tables found")
 
-            return {
-                "exists": len(tables) > 0,
-                "tables": tables,
-                "complete": len(tables) == 7,  # 3 nodes + 4 edges
-            }
+        return {
+            "exists": len(tables) > 0,
+            "tables": tables,
+            "complete": len(tables) == 6,  # 3 nodes + 3 edges
+        }
     except Exception as e:
         print(f"  Schema check failed: {e}")
         return {"exists": False, "tables": [], "complete": False}
 
 
-def drop_schema() -> bool:
+def drop_schema(cursor) -> bool:
     """Drop all schema tables."""
     print("Dropping existing schema...")
     try:
-        with get_db_cursor(commit=True) as cursor:
-            # Execute each DROP statement separately
-            for statement in DROP_SCHEMA_SQL.strip().split(";"):
-                statement = statement.strip()
-                if statement and not statement.startswith("--"):
-                    cursor.execute(statement)
-            print("  Schema dropped")
-            return True
+        for batch in split_batches(DROP_SCHEMA_SQL):
+            cursor.execute(batch)
+        print("  Schema dropped")
+        return True
     except Exception as e:
         print(f"  Drop failed: {e}")
         return False
 
 
-def create_schema() -> bool:
+def create_schema(cursor) -> bool:
     """Create all schema tables."""
     print("Creating schema tables...")
     try:
-        with get_db_cursor(commit=True) as cursor:
-            # Split and execute each CREATE statement separately
-            # Azure SQL doesn't support multiple statements in one execute
-            statements = []
-            current = []
-
-            for line in SCHEMA_SQL.split("\n"):
-                # Skip pure comment lines but keep inline comments
-                if line.strip().startswith("--"):
-                    continue
-                current.append(line)
-                if ";" in line:
-                    statements.append("\n".join(current))
-                    current = []
-
-            for i, statement in enumerate(statements, 1):
-                statement = statement.strip()
-                if statement:
-                    try:
-                        cursor.execute(statement)
-                    except Exception as e:
-                        # Extract table/index name for better error message
-                        if "CREATE TABLE" in statement:
-                            name = statement.split("CREATE TABLE")[1].split("(")[0].strip()
-                            print(f"  Failed creating table {name}: {e}")
-                        elif "CREATE" in statement and "INDEX" in statement:
-                            name = statement.split("INDEX")[1].split("ON")[0].strip()
-                            print(f"  Failed creating index {name}: {e}")
-                        else:
-                            print(f"  Failed statement {i}: {e}")
-                        raise
-
-            print("  Schema created successfully")
-            return True
+        # One execute per GO batch (tables, edges, indexes) instead
+        # of a round-trip per statement
+        for i, batch in enumerate(split_batches(SCHEMA_SQL), 1):
+            try:
+                cursor.execute(batch)
+            except Exception as e:
+                first_line = batch.lstrip("-\n ").splitlines()[0]
+                print(f"  Failed batch {i} ({first_line[:50]}...): {e}")
+                raise
+
+        print("  Schema created successfully")
+        return True
     except Exception as e:
         print(f"  Schema creation failed: {e}")
         return False
 
 
-def verify_schema() -> bool:
+def create_fulltext() -> bool:
+    """Create the full-text catalog and index for keyword search.
+
+    Full-text DDL cannot run inside a user transaction, so this uses a
+    dedicated autocommit connection instead of get_db_cursor. Batches
+    are idempotent - existing catalog/index are left alone.
+    """
+    print("Creating full-text index for keyword search...")
+    try:
+        conn = get_connection()
+        conn.autocommit = True
+        try:
+            cursor = conn.cursor()
+            for batch in split_batches(FULLTEXT_SQL):
+                cursor.execute(batch)
+            cursor.close()
+        finally:
+            conn.close()
+        print("  Full-text index ready")
+        return True
+    except Exception as e:
+        print(f"  Full-text setup failed: {e}")
+        print("  (keyword search needs it; semantic search is unaffected)")
+        return False
+
+
+def verify_schema(cursor) -> bool:
     """Verify schema was created correctly."""
     print("Verifying schema...")
-    status = check_schema()
+    status = check_schema(cursor)
     if status["complete"]:
-        print("  All 7 tables created (3 nodes, 4 edges)")
+        print("  All 6 tables created (3 nodes, 3 edges)")
         return True
     else:
-        print(f"  Incomplete: only {len(status['tables'])} of 7 tables found")
+        print(f"  Incomplete: only {len(status['tables'])} of 6 tables found")
         return False
 
 
-def run_migration() -> bool:
+def run_migration(cursor) -> bool:
     """Run migration to add chunk processing status columns.
 
     This migration is idempotent - safe to run multiple times.
@@ -156,62 +167,40 @@ def run_migration() -> bool:
     """
     print("Running migration: Add chunk processing status columns...")
     try:
-        with get_db_cursor(commit=True) as cursor:
-            # Split and execute each statement separately
-            # Azure SQL doesn't support multiple statements with GO in pyodbc
-            statements = []
-            current = []
-
-            for line in MIGRATION_ADD_CHUNK_STATUS_SQL.split("\n"):
-                # Skip pure comment lines
-                if line.strip().startswith("--"):
-                    continue
-                current.append(line)
-                # Split on semicolons, but handle BEGIN...END blocks
-                if line.strip().endswith(";") and "BEGIN" not in "".join(current):
-                    statements.append("\n".join(current))
-                    current = []
-                elif line.strip() == "END;":
-                    statements.append("\n".join(current))
-                    current = []
-
-            for statement in statements:
-                statement = statement.strip()
-                if statement:
-                    try:
-                        cursor.execute(statement)
-                    except Exception as e:
-                        print(f"  Warning: {e}")
-                        # Continue - some statements may fail if already applied
-
-            print("  Migration complete")
-            return True
+        for batch in split_batches(MIGRATION_ADD_CHUNK_STATUS_SQL):
+            try:
+                cursor.execute(batch)
+            except Exception as e:
+                print(f"  Warning: {e}")
+                # Continue - some batches may fail if already applied
+
+        print("  Migration complete")
+        return True
     except Exception as e:
         print(f"  Migration failed: {e}")
         return False
 
 
-def check_chunk_status_columns() -> bool:
+def check_chunk_status_columns(cursor) -> bool:
     """Check if chunk processing status columns exist."""
     print("Checking for chunk status columns...")
     try:
-        with get_db_cursor() as cursor:
-            cursor.execute("""
-                SELECT COLUMN_NAME
-                FROM INFORMATION_SCHEMA.COLUMNS
-                WHERE TABLE_NAME = 'chunks'
-                  AND COLUMN_NAME IN ('embedding_status', 'concept_status')
-            """)
-            columns = [row[0] for row in cursor.fetchall()]
-            if len(columns) == 2:
-                print("  Chunk status columns exist (embedding_status, concept_status)")
-                return True
-            elif len(columns) > 0:
-                print(f"  Partial: only {columns} found")
-                return False
-            else:
-                print("  Chunk status columns not found - run with --migrate")
-                return False
+        cursor.execute("""
+            SELECT COLUMN_NAME
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_NAME = 'chunks'
+              AND COLUMN_NAME IN ('embedding_status', 'concept_status')
+        """)
+        columns = [row[0] for row in cursor.fetchall()]
+        if len(columns) == 2:
+            print("  Chunk status columns exist (embedding_status, concept_status)")
+            return True
+        elif len(columns) > 0:
+            print(f"  Partial: only {columns} found")
+            return False
+        else:
+            print("  Chunk status columns not found - run with --migrate")
+            return False
     except Exception as e:
         print(f"  Check failed: {e}")
         return False
@@ -244,64 +233,76 @@ def main() -> None:
     print("=" * 55)
     print()
 
-    # Test connection first
-    if not check_connection():
-        print("\nFix connection issues before proceeding.")
-        sys.exit(1)
-    print()
-
-    # Check current status
-    status = check_schema()
-    print()
-
-    # Check-only mode
-    if args.check:
-        if status["complete"]:
-            print("Schema is complete and ready.")
-            check_chunk_status_columns()
-        elif status["exists"]:
-            print("Schema is incomplete. Run without --check to finish setup.")
-        else:
-            print("No schema found. Run without --check to create.")
-        return
-
-    # Migration mode
-    if args.migrate:
-        if not status["exists"]:
-            print("No schema found. Run without --migrate first to create schema.")
-            return
-        print()
-        if not run_migration():
+    # All phases share one connection - each reconnect to Azure SQL
+    # costs a TLS handshake (plus AAD under managed identity), and the
+    # checks and DDL here are a handful of small statements. Full-text
+    # setup runs afterwards on its own autocommit connection, once the
+    # shared transaction has committed.
+    fulltext_needed = False
+
+    with get_db_cursor(commit=True) as cursor:
+        # Test connection first
+        if not check_connection(cursor):
+            print("\nFix connection issues before proceeding.")
             sys.exit(1)
         print()
-        check_chunk_status_columns()
+
+        # Check current status
+        status = check_schema(cursor)
         print()
-        print("Done!")
-        return
-
-    # Reset mode
-    if args.reset:
-        if status["exists"]:
-            confirm = input("This will DELETE ALL DATA. Type 'yes' to confirm: ")
-            if confirm.lower() != "yes":
-                print("Aborted.")
+
+        # Check-only mode
+        if args.check:
+            if status["complete"]:
+                print("Schema is complete and ready.")
+                check_chunk_status_columns(cursor)
+            elif status["exists"]:
+                print("Schema is incomplete. Run without --check to finish setup.")
+            else:
+                print("No schema found. Run without --check to create.")
+            return
+
+        # Migration mode
+        if args.migrate:
+            if not status["exists"]:
+                print("No schema found. Run without --migrate first to create schema.")
                 return
-            if not drop_schema():
+            print()
+            if not run_migration(cursor):
                 sys.exit(1)
             print()
+            check_chunk_status_columns(cursor)
+            fulltext_needed = True
 
-    # Create if needed
-    if args.reset or not status["exists"]:
-        if not create_schema():
-            sys.exit(1)
+        else:
+            # Reset mode
+            if args.reset:
+                if status["exists"]:
+                    confirm = input("This will DELETE ALL DATA. Type 'yes' to confirm: ")
+                    if confirm.lower() != "yes":
+                        print("Aborted.")
+                        return
+                    if not drop_schema(cursor):
+                        sys.exit(1)
+                    print()
+
+            # Create if needed
+            if args.reset or not status["exists"]:
+                if not create_schema(cursor):
+                    sys.exit(1)
+                print()
+                if not verify_schema(cursor):
+                    sys.exit(1)
+                fulltext_needed = True
+            elif status["complete"]:
+                print("Schema already exists and is complete.")
+                print("Use --reset to drop and recreate.")
+            else:
+                print("Partial schema exists. Use --reset to clean up.")
+
+    if fulltext_needed:
         print()
-        if not verify_schema():
-            sys.exit(1)
-    elif status["complete"]:
-        print("Schema already exists and is complete.")
-        print("Use --reset to drop and recreate.")
-    else:
-        print("Partial schema exists. Use --reset to clean up.")
+        create_fulltext()
 
     print()
     print("Done!")
@@ -1,14 +1,50 @@
 #!/usr/bin/env python3
 """Test connectivity to Azure resources for Second Brain."""
 
+import io
+import itertools
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Stop counting blobs past this many - a connectivity check needs to
+# know files exist, not the exact size of a huge container
+MAX_BLOB_COUNT = 1000
+
+
+class _ThreadLocalCapture(io.TextIOBase):
+    """Route print() output to a per-thread buffer when one is active.
+
+    The tests run concurrently and print as they go; sys.stdout is
+    process-wide, so a plain redirect_stdout would interleave (or
+    misattribute) their output. Each worker registers its own buffer
+    and anything printed from that thread lands there; other threads
+    fall through to the real stdout.
+    """
+
+    def __init__(self, fallback):
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def register(self) -> io.StringIO:
+        """Capture this thread's output into a fresh buffer."""
+        self._local.buffer = io.StringIO()
+        return self._local.buffer
+
+    def write(self, s: str) -> int:
+        target = getattr(self._local, "buffer", None) or self._fallback
+        return target.write(s)
+
+    def flush(self) -> None:
+        target = getattr(self._local, "buffer", None) or self._fallback
+        target.flush()
+
 
 def test_azure_sql() -> bool:
     """Test Azure SQL Database connection."""
@@ -35,19 +71,18 @@ def test_azure_sql() -> bool:
         conn = pyodbc.connect(conn_str)
         cursor = conn.cursor()
 
-        # Test basic query
-        cursor.execute("SELECT @@VERSION;")
-        version = cursor.fetchone()[0]
+        # Version and SQL Graph support (built-in to Azure SQL) in a
+        # single round-trip - each separate query costs a full RTT
+        # over TLS
+        cursor.execute("""
+            SELECT @@VERSION,
+                   CASE WHEN SERVERPROPERTY('EngineEdition') IN (5, 6, 8)
+                        THEN 1 ELSE 0 END AS IsAzureSQL;
+        """)
+        version, is_azure = cursor.fetchone()
         print("  + Connected to Azure SQL")
         print(f"    Version: {version[:60]}...")
 
-        # Test SQL Graph support (it's built-in to Azure SQL)
-        cursor.execute("""
-            SELECT CASE
-                WHEN SERVERPROPERTY('EngineEdition') IN (5, 6, 8)
-                THEN 1 ELSE 0 END AS IsAzureSQL;
-        """)
-        is_azure = cursor.fetchone()[0]
         if is_azure:
             print("  + Azure SQL detected (SQL Graph supported)")
         else:
@@ -88,10 +123,15 @@ def test_blob_storage() -> bool:
         if container_name in container_names:
             print(f"  + Container '{container_name}' exists")
 
-            # Count blobs
+            # Count blobs by streaming names only - list_blobs pages
+            # full property objects per blob, while names come back as
+            # bare strings. The count stops at MAX_BLOB_COUNT so a
+            # large container can't stall the check on paged listings.
             container_client = blob_service.get_container_client(container_name)
-            blobs = list(container_client.list_blobs())
-            print(f"    Files: {len(blobs)}")
+            names = container_client.list_blob_names()
+            count = sum(1 for _ in itertools.islice(names, MAX_BLOB_COUNT))
+            suffix = "+" if count >= MAX_BLOB_COUNT else ""
+            print(f"    Files: {count}{suffix}")
         else:
             print(f"  - Container '{container_name}' not found")
             print(f"    Create it in Azure Portal or update AZURE_STORAGE_CONTAINER_NAME")
@@ -123,8 +163,30 @@ def main() -> None:
         print("  Copy .env.example to .env and fill in your values")
         print()
 
-    results.append(("Azure SQL", test_azure_sql()))
-    results.append(("Blob Storage", test_blob_storage()))
+    # The two tests share no state and each stalls on network for a
+    # second or two, so run them concurrently and let the latencies
+    # overlap; output is captured per thread and replayed in order
+    capture = _ThreadLocalCapture(sys.stdout)
+
+    def run_captured(test):
+        buffer = capture.register()
+        return test(), buffer.getvalue()
+
+    original_stdout, sys.stdout = sys.stdout, capture
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            sql_future = pool.submit(run_captured, test_azure_sql)
+            blob_future = pool.submit(run_captured, test_blob_storage)
+            outcomes = [
+                ("Azure SQL", sql_future.result()),
+                ("Blob Storage", blob_future.result()),
+            ]
+    finally:
+        sys.stdout = original_stdout
+
+    for name, (passed, output) in outcomes:
+        print(output, end="")
+        results.append((name, passed))
 
     print()
     print("=" * 50)
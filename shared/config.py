@@ -36,3 +36,7 @@ AZURE_SQL_USE_MI = os.environ.get("AZURE_SQL_USE_MI", "false")  # Use managed id
 
 # Anthropic Claude API
 ANTHROPIC_API_KEY = os.environ.get("ANTHROPIC_API_KEY", "")
+
+# Search tuning (app/controllers/search.py)
+# Scoring block size for the in-process index; 0 = derive from row count
+SEARCH_SCORE_BLOCK_ROWS = int(os.environ.get("SEARCH_SCORE_BLOCK_ROWS", "0"))
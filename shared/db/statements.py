@@ -0,0 +1,156 @@
+"""Hot SQL statements for the chunk-processing path.
+
+SQL Server keys its plan cache on the exact statement text, so the
+statements the timer function runs hundreds of times per invocation
+live here as import-time constants: every call site submits
+byte-identical SQL with bound parameters and reuses the cached plan -
+the closest SQL Server gets to named PREPARE / EXECUTE. Status codes
+are interpolated from models at import time, so they are part of the
+fixed text rather than per-call parameters and the filtered-index
+predicates stay matchable.
+"""
+
+from .models import CONCEPT_STATUS_CODES, EMBEDDING_STATUS_CODES
+
+_EMB_PENDING = EMBEDDING_STATUS_CODES["PENDING"]
+_EMB_COMPLETE = EMBEDDING_STATUS_CODES["COMPLETE"]
+_EMB_FAILED = EMBEDDING_STATUS_CODES["FAILED"]
+_EMB_PROCESSING = EMBEDDING_STATUS_CODES["PROCESSING"]
+_CON_PENDING = CONCEPT_STATUS_CODES["PENDING"]
+_CON_EXTRACTED = CONCEPT_STATUS_CODES["EXTRACTED"]
+_CON_PROCESSING = CONCEPT_STATUS_CODES["PROCESSING"]
+
+# Served entirely by the filtered covering index
+# IX_chunks_pending_embedding - no sources join, no key lookups
+GET_PENDING_EMBEDDING_CHUNKS = f"""
+    SELECT TOP (?) id, source_id, text
+    FROM chunks
+    WHERE embedding_status = {_EMB_PENDING}
+    ORDER BY source_id, position
+"""
+
+UPDATE_CHUNK_EMBEDDING = """
+    UPDATE chunks
+    SET embedding_bin = ?, embedding_status = ?
+    WHERE id = ?
+"""
+
+# Batch variant: stage rows with fast_executemany, apply one
+# UPDATE...JOIN. Temp tables are session-scoped and the connection
+# pool recycles live sessions, so the previous batch's #emb may still
+# exist on this connection - drop it first or the CREATE fails (2714).
+CREATE_EMBEDDING_STAGE = """
+    DROP TABLE IF EXISTS #emb;
+    CREATE TABLE #emb (
+        id INT PRIMARY KEY,
+        embedding_bin VARBINARY(6144)
+    )
+"""
+
+INSERT_EMBEDDING_STAGE = "INSERT INTO #emb (id, embedding_bin) VALUES (?, ?)"
+
+APPLY_EMBEDDING_STAGE = """
+    UPDATE c
+    SET c.embedding_bin = e.embedding_bin, c.embedding_status = ?
+    FROM chunks c
+    JOIN #emb e ON e.id = c.id
+"""
+
+MARK_EMBEDDING_FAILED = f"""
+    UPDATE chunks
+    SET embedding_status = {_EMB_FAILED},
+        extraction_error = ?,
+        extraction_attempts = extraction_attempts + 1
+    WHERE id = ?
+"""
+
+# Served by the filtered covering index IX_chunks_pending_concept
+GET_PENDING_CONCEPT_CHUNKS = f"""
+    SELECT TOP (?) id, source_id, text
+    FROM chunks
+    WHERE embedding_status = {_EMB_COMPLETE}
+      AND concept_status = {_CON_PENDING}
+      AND extraction_attempts < 3
+    ORDER BY source_id, position
+"""
+
+MARK_CONCEPT_STATUS = """
+    UPDATE chunks
+    SET concept_status = ?
+    WHERE id = ?
+"""
+
+MARK_CONCEPT_STATUS_WITH_ERROR = """
+    UPDATE chunks
+    SET concept_status = ?,
+        extraction_error = ?,
+        extraction_attempts = extraction_attempts + 1
+    WHERE id = ?
+"""
+
+CHECK_SOURCE_COMPLETE = f"""
+    SELECT
+        COUNT(*) as total,
+        SUM(CASE WHEN embedding_status = {_EMB_COMPLETE} THEN 1 ELSE 0 END) as embedded,
+        SUM(CASE WHEN concept_status = {_CON_EXTRACTED} THEN 1 ELSE 0 END) as extracted
+    FROM chunks
+    WHERE source_id = ?
+"""
+
+# Atomic claim for concurrent workers: UPDLOCK makes picked rows
+# exclusive, READPAST skips rows another worker already locked (SQL
+# Server's SKIP LOCKED), and the single UPDATE flips them to
+# PROCESSING and returns them via OUTPUT - no window where two
+# workers hold the same chunk, no second round-trip to mark the
+# claim. Claimed rows leave the filtered pending indexes, so the
+# next poll never re-reads them; stale claims requeue below.
+CLAIM_PENDING_EMBEDDING_CHUNKS = f"""
+    WITH pick AS (
+        SELECT TOP (?) id, source_id, text, embedding_status, claimed_at
+        FROM chunks WITH (UPDLOCK, READPAST, ROWLOCK)
+        WHERE embedding_status = {_EMB_PENDING}
+        ORDER BY source_id, position
+    )
+    UPDATE pick
+    SET embedding_status = {_EMB_PROCESSING}, claimed_at = GETUTCDATE()
+    OUTPUT inserted.id, inserted.source_id, inserted.text
+"""
+
+CLAIM_PENDING_CONCEPT_CHUNKS = f"""
+    WITH pick AS (
+        SELECT TOP (?) id, source_id, text, concept_status, claimed_at
+        FROM chunks WITH (UPDLOCK, READPAST, ROWLOCK)
+        WHERE embedding_status = {_EMB_COMPLETE}
+          AND concept_status = {_CON_PENDING}
+          AND extraction_attempts < 3
+        ORDER BY source_id, position
+    )
+    UPDATE pick
+    SET concept_status = {_CON_PROCESSING}, claimed_at = GETUTCDATE()
+    OUTPUT inserted.id, inserted.source_id, inserted.text
+"""
+
+# Claims whose worker died (function timeout, crash) go back to
+# PENDING after the cutoff; parameter is the age in minutes
+REQUEUE_STALE_EMBEDDING_CLAIMS = f"""
+    UPDATE chunks
+    SET embedding_status = {_EMB_PENDING}, claimed_at = NULL
+    WHERE embedding_status = {_EMB_PROCESSING}
+      AND claimed_at < DATEADD(MINUTE, -?, GETUTCDATE())
+"""
+
+REQUEUE_STALE_CONCEPT_CLAIMS = f"""
+    UPDATE chunks
+    SET concept_status = {_CON_PENDING}, claimed_at = NULL
+    WHERE concept_status = {_CON_PROCESSING}
+      AND claimed_at < DATEADD(MINUTE, -?, GETUTCDATE())
+"""
+
+# GROUP BY produces at most ~9 rows (3x3 status combinations),
+# letting SQL Server use a plain hash aggregate instead of
+# evaluating six CASE expressions per row
+PROCESSING_STATS = """
+    SELECT embedding_status, concept_status, COUNT(*)
+    FROM chunks
+    GROUP BY embedding_status, concept_status
+"""